@@ -0,0 +1,142 @@
+from variable import Variable
+from domain import Domain
+from constraint import LessThan, SumUp, AllUnique
+from solver import Solver, BTSolver
+
+# Alphametic puzzles, e.g. SEND + MORE = MONEY, as `BTSolver` models.
+#  Each letter is a digit, different letters are different digits, and the
+#  first letter of a word isn't 0.
+
+
+# domain_type: the domain implementation of all variables, see `Variable`
+def parse_question(s: str, domain_type: type = Domain) -> Solver:
+    solver = BTSolver()
+
+    # Split input string by '+' or '=' and clean up
+    lines = [x.strip() for x in s.replace("+", "=").split("=") if x.strip()]
+
+    # Get all unique characters, in order of appearance so the variable ids
+    #  don't depend on the string hash seed
+    all_chars = list(dict.fromkeys("".join(lines)))
+
+    # --------------- Variables ---------------
+    variables = dict[str, Variable]()
+
+    # All characters are 0-9
+    non_0_chars = set(line[0] for line in lines)
+    for ch in all_chars:
+        if ch in non_0_chars:
+            variables[ch] = Variable(ch, list(range(1, 10)), domain_type)
+        else:
+            variables[ch] = Variable(ch, list(range(0, 10)), domain_type)
+
+    # Carries
+    max_column = len(lines[-1])
+    max_carry = 0
+    for col in range(max_column - 1):
+        char_count_at_col = sum(1 for line in lines[:-1] if len(line) > col)
+        max_carry = (9 * char_count_at_col + max_carry) // 10
+
+        variables[f"c{col}"] = Variable(
+            f"c{col}", list(range(max_carry + 1)), domain_type
+        )
+
+    for v in variables.values():
+        solver.add_variable(v)
+
+    # -------------- Constraints ------------
+    # 1. Letters not equal to each other
+    non_carry_variables = [v for v in variables.values() if not v.name.startswith("c")]
+    solver.add_constraints(AllUnique(non_carry_variables))
+
+    # 2. All chars on the left most column must be < the char at last_line[0]
+    # e.g.: for SEND+MORE=GOLD, this means S<G and M<G
+    # If there's only one, then it must == char0_last_line
+    char0_last_line = lines[-1][0]
+    for line in lines[:-1]:
+        if len(line) == max_column:
+            solver.add_constraint(
+                LessThan(
+                    variables[line[0]],
+                    variables[char0_last_line],
+                    include_equal=True,
+                )
+            )
+
+    # 3. Column sum up
+    for col in range(max_column):
+        laddends = []
+        lcoeffs = []
+        raddends = []
+        rcoeffs = []
+
+        for line in lines[:-1]:  # except the last line
+            if col < len(line):
+                char = line[-(col + 1)]
+                laddends.append(variables[char])
+                lcoeffs.append(1)
+
+        # add the sum char as -1*sum_char
+        sum_char = lines[-1][-(col + 1)]
+        raddends.append(variables[sum_char])
+        rcoeffs.append(1)
+
+        # TODO: handle carry greater than 10, such as 20?
+
+        # Add carry from previous column
+        if col > 0:
+            laddends.append(variables[f"c{col - 1}"])
+            lcoeffs.append(1)  # carry is always 1
+
+        # Sub carry for this column
+        if col != max_column - 1:
+            raddends.append(variables[f"c{col}"])
+            rcoeffs.append(10)  # always -10
+
+        solver.add_constraint(SumUp(laddends, lcoeffs, raddends, rcoeffs))
+
+    return solver
+
+
+# Puzzles that only differ by letter renaming build the same model, e.g.
+#  "SEND + MORE = MONEY" and "TAXI + CBLA = CBXAZ". The canonical form renames
+#  the letters A, B, C.. by first appearance and normalizes the spacing:
+#
+#   canonical("TO + GO == OUT")  ->  ("AB + CB == BDA", ["T", "O", "G", "U"])
+#
+# return: (the canonical question, the original letter of A, B, C..)
+def canonical(s: str) -> tuple[str, list[str]]:
+    sides = s.replace("==", "=").split("=")
+    words = [[w.strip() for w in side.split("+") if w.strip()] for side in sides]
+
+    letters = list[str]()
+    rename = dict[str, str]()
+    for ch in "".join("".join(side) for side in words):
+        if ch not in rename:
+            rename[ch] = canonical_letter(len(letters))
+            letters.append(ch)
+
+    key = " == ".join(
+        " + ".join("".join(rename[ch] for ch in w) for w in side) for side in words
+    )
+    return key, letters
+
+
+# The i-th letter of a canonical puzzle
+def canonical_letter(i: int) -> str:
+    return chr(ord("A") + i) if i < 26 else chr(0x100 + i)
+
+
+# The puzzles of `test_alphametics.py`, by name
+PUZZLES = {
+    "send_more_money": "SEND + MORE = MONEY",
+    "i_bb_ill": "I + BB == ILL",
+    "as_a_mom": "AS + A == MOM",
+    "no_no_too_late": "NO + NO + TOO == LATE",
+    "he_sees_the_light": "HE + SEES + THE == LIGHT",
+    "a_a_a_a_a_a_a_a_a_a_b_bcc": "A + A + A + A + A + A + A + A + A + A + A + B == BCC",
+    "and_a_strong_offense_as_a_good_defense": "AND + A + STRONG + OFFENSE + AS + A + GOOD == DEFENSE",
+    "long_1": "TEN + HERONS + REST + NEAR + NORTH + SEA + SHORE + AS + TAN + TERNS + SOAR + TO + ENTER + THERE + AS + HERONS + NEST + ON + STONES + AT + SHORE + THREE + STARS + ARE + SEEN + TERN + SNORES + ARE + NEAR == SEVVOTH",
+    "long_2": "SO + MANY + MORE + MEN + SEEM + TO + SAY + THAT + THEY + MAY + SOON + TRY + TO + STAY + AT + HOME +  SO + AS + TO + SEE + OR + HEAR + THE + SAME + ONE + MAN + TRY + TO + MEET + THE + TEAM + ON + THE + MOON + AS + HE + HAS + AT + THE + OTHER + TEN == TESTS",
+    "long_3": "THIS + A + FIRE + THEREFORE + FOR + ALL + HISTORIES + I + TELL + A + TALE + THAT + FALSIFIES + ITS + TITLE + TIS + A + LIE + THE + TALE + OF + THE + LAST + FIRE + HORSES + LATE + AFTER + THE + FIRST + FATHERS + FORESEE + THE + HORRORS + THE + LAST + FREE + TROLL + TERRIFIES + THE + HORSES + OF + FIRE + THE + TROLL + RESTS + AT + THE + HOLE + OF + LOSSES + IT + IS + THERE + THAT + SHE + STORES + ROLES + OF + LEATHERS + AFTER + SHE + SATISFIES + HER + HATE + OFF + THOSE + FEARS + A + TASTE + RISES + AS + SHE + HEARS + THE + LEAST + FAR + HORSE + THOSE + FAST + HORSES + THAT + FIRST + HEAR + THE + TROLL + FLEE + OFF + TO + THE + FOREST + THE + HORSES + THAT + ALERTS + RAISE + THE + STARES + OF + THE + OTHERS + AS + THE + TROLL + ASSAILS + AT + THE + TOTAL + SHIFT + HER + TEETH + TEAR + HOOF + OFF + TORSO + AS + THE + LAST + HORSE + FORFEITS + ITS + LIFE + THE + FIRST + FATHERS + HEAR + OF + THE + HORRORS + THEIR + FEARS + THAT + THE + FIRES + FOR + THEIR + FEASTS + ARREST + AS + THE + FIRST + FATHERS + RESETTLE + THE + LAST + OF + THE + FIRE + HORSES + THE + LAST + TROLL + HARASSES + THE + FOREST + HEART + FREE + AT + LAST + OF + THE + LAST + TROLL + ALL + OFFER + THEIR + FIRE + HEAT + TO + THE + ASSISTERS + FAR + OFF + THE + TROLL + FASTS + ITS + LIFE + SHORTER + AS + STARS + RISE + THE + HORSES + REST + SAFE + AFTER + ALL + SHARE + HOT + FISH + AS + THEIR + AFFILIATES + TAILOR + A + ROOFS + FOR + THEIR + SAFE == FORTRESSES",
+}
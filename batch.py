@@ -0,0 +1,144 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from time import perf_counter
+
+from alphametics import parse_question
+from domain import Domain
+from solver import BTSolver
+
+# Solve many puzzles over a pool of worker processes.
+#
+# The inputs are alphametic strings, parsed in the workers, or `BTSolver`
+#  models. They are sent in chunks of `chunksize`, at most `max_in_flight`
+#  chunks are submitted at a time, so a huge or endless iterable is consumed
+#  lazily and memory stays bounded. One `BatchResult` per input is yielded,
+#  in input order (`ordered=True`) or as soon as its chunk completes.
+#
+#   for r in solve_batch(open("puzzles.txt"), workers=8):
+#       print(r.input, r.solutions, r.stats)
+#
+# workers=1 solves in the calling process, without a pool.
+
+
+class BatchResult:
+    def __init__(self, index: int, input, solutions, stats: dict, error=None):
+        self.index = index  # position in the input iterable
+        self.input = input
+        self.solutions = solutions  # list[dict[str, int]]
+        self.stats = stats  # nodes, fails, time, status
+        self.error = error  # the error message if solving raised
+
+    def __repr__(self):
+        return (
+            f"BatchResult({self.index}, solutions: {len(self.solutions)}, "
+            f"stats: {self.stats}, error: {self.error})"
+        )
+
+
+def solve_batch(
+    puzzles,
+    workers: int | None = None,
+    chunksize: int = 16,
+    max_in_flight: int | None = None,
+    ordered: bool = True,
+    find_all: bool = False,
+    time_limit: float | None = None,
+    domain_type: type = Domain,
+):
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or 2 * workers
+    options = (find_all, time_limit, domain_type)
+
+    chunks = chunked(enumerate(puzzles), chunksize)
+    if workers == 1:
+        for chunk in chunks:
+            yield from results_of(chunk, solve_chunk(chunk, options))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = dict()  # future -> chunk
+        done_chunks = dict[int, list[BatchResult]]()  # first index -> results
+        next_index = 0
+
+        def submit() -> bool:
+            chunk = next(chunks, None)
+            if chunk is None:
+                return False
+            pending[pool.submit(solve_chunk, chunk, options)] = chunk
+            return True
+
+        while len(pending) < max_in_flight and submit():
+            pass
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk = pending.pop(future)
+                results = list(results_of(chunk, future.result()))
+                if ordered:
+                    done_chunks[chunk[0][0]] = results
+                else:
+                    yield from results
+                submit()
+
+            # ordered: yield the completed chunks that are next in line
+            while next_index in done_chunks:
+                results = done_chunks.pop(next_index)
+                yield from results
+                next_index += len(results)
+
+
+def chunked(items, size: int):
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, size))
+        if len(chunk) == 0:
+            return
+        yield chunk
+
+
+def results_of(chunk, outputs):
+    for (index, puzzle), (solutions, stats, error) in zip(chunk, outputs):
+        yield BatchResult(index, puzzle, solutions, stats, error)
+
+
+# ---------------- worker process ----------------
+
+
+# return: (solutions, stats, error) of each puzzle of the chunk
+def solve_chunk(chunk, options) -> list[tuple]:
+    return [solve_one(puzzle, options) for _, puzzle in chunk]
+
+
+# A `BTSolver` input is solved in place, with workers=1 it's the caller's
+#  model: its options and solutions are put back afterwards.
+def solve_one(puzzle, options) -> tuple:
+    find_all, time_limit, domain_type = options
+    st = perf_counter()
+    if isinstance(puzzle, BTSolver):
+        solver = puzzle
+        saved = (solver.solutions, solver.find_all, solver.time_limit)
+    else:
+        solver = None
+    try:
+        if solver is None:
+            solver = parse_question(puzzle, domain_type)
+        solver.solutions = []
+        solver.find_all = find_all
+        solver.time_limit = time_limit
+        solver.solve()
+        solutions = solver.solutions
+    except Exception as e:
+        return [], {"time": perf_counter() - st}, f"{type(e).__name__}: {e}"
+    finally:
+        if puzzle is solver:
+            solver.solutions, solver.find_all, solver.time_limit = saved
+
+    stats = {
+        "nodes": solver.stats.nodes,
+        "fails": solver.stats.fails,
+        "time": perf_counter() - st,
+        "status": solver.status,
+    }
+    return solutions, stats, None
@@ -0,0 +1,218 @@
+import argparse
+import json
+import os
+import platform
+import sys
+from datetime import datetime, timezone
+from statistics import median, quantiles
+from time import perf_counter
+
+from alphametics import PUZZLES, parse_question
+from constraint import AllUnique, LessThan
+from solver import BTSolver
+from variable import Variable
+
+# Benchmark suite of the solver.
+#
+# Every case is solved in both modes, "one" (first solution) and "all",
+#  after `--warmup` untimed runs, `--repeat` timed runs. A run builds the
+#  model then solves it, only the solve is timed. The report has:
+#   - median / min / max / iqr of the solve time, in seconds
+#   - counters of the last run: nodes, fails, propagations (constraint runs),
+#     solutions. They don't depend on the machine, a change means the search
+#     itself changed.
+#
+# The iteration order of sets of strings depends on the string hash, so the
+#  suite always runs with a fixed PYTHONHASHSEED.
+#
+#   python bench.py                               # all cases
+#   python bench.py -k long -k pigeon             # cases containing any of them
+#   python bench.py --json out.json               # save the results
+#   python bench.py --baseline out.json           # compare, exit 1 on regression
+
+HASH_SEED = "0"
+
+
+# ---------------- cases ----------------
+
+
+# n+1 pigeons in n holes, with pairwise NotEqual, infeasible
+def pigeonhole(n: int) -> BTSolver:
+    solver = BTSolver()
+    pigeons = [Variable(f"p{i}", list(range(n))) for i in range(n + 1)]
+    solver.add_variables(pigeons)
+    solver.add_constraints(AllUnique(pigeons, consistency="pairwise"))
+    return solver
+
+
+# x0 < x1 < ... < x(n-1), all in 0..n, n+1 solutions
+#  (`LessThan` is strict with `include_equal=True`)
+def chain(n: int) -> BTSolver:
+    solver = BTSolver()
+    xs = [Variable(f"x{i}", list(range(n + 1))) for i in range(n)]
+    solver.add_variables(xs)
+    for a, b in zip(xs, xs[1:]):
+        solver.add_constraint(LessThan(a, b, include_equal=True))
+    return solver
+
+
+# A + A + ... + A == BC, a long repeated column
+def repeated(n: int) -> BTSolver:
+    return parse_question(" + ".join(["A"] * n) + " == BC")
+
+
+# name -> model builder
+def cases() -> dict:
+    all_cases = dict()
+    for name, question in PUZZLES.items():
+        all_cases[f"alphametic/{name}"] = lambda q=question: parse_question(q)
+    for n in [5, 6, 7]:
+        all_cases[f"pigeonhole/{n}"] = lambda n=n: pigeonhole(n)
+    for n in [10, 20, 40]:
+        all_cases[f"chain/{n}"] = lambda n=n: chain(n)
+    for n in [10, 50, 200]:
+        all_cases[f"repeated/{n}"] = lambda n=n: repeated(n)
+    return all_cases
+
+
+# ---------------- runner ----------------
+
+
+def run(build, find_all: bool) -> tuple[float, dict]:
+    solver = build()
+    solver.find_all = find_all
+
+    st = perf_counter()
+    solver.solve()
+    cost = perf_counter() - st
+
+    pops = solver.scheduler.stats()["pops"]
+    counters = {
+        "nodes": solver.stats.nodes,
+        "fails": solver.stats.fails,
+        "propagations": sum(pops.values()),
+        "solutions": len(solver.solutions),
+    }
+    return cost, counters
+
+
+def bench(build, find_all: bool, warmup: int, repeat: int) -> dict:
+    for _ in range(warmup):
+        run(build, find_all)
+
+    costs = []
+    counters = {}
+    for _ in range(repeat):
+        cost, counters = run(build, find_all)
+        costs.append(cost)
+
+    iqr = 0.0
+    if len(costs) > 1:
+        q1, _, q3 = quantiles(costs, n=4)
+        iqr = q3 - q1
+
+    return {
+        "median": median(costs),
+        "min": min(costs),
+        "max": max(costs),
+        "iqr": iqr,
+        "repeat": repeat,
+        **counters,
+    }
+
+
+def run_suite(keywords: list[str], warmup: int, repeat: int) -> dict:
+    results = {}
+    for name, build in cases().items():
+        if keywords and not any(k in name for k in keywords):
+            continue
+        for mode in ["one", "all"]:
+            key = f"{name}/{mode}"
+            r = bench(build, mode == "all", warmup, repeat)
+            results[key] = r
+            print(
+                f"{r['median']:9.4f}s ±{r['iqr']:.4f}  "
+                f"nodes {r['nodes']:>7}  fails {r['fails']:>7}  {key}"
+            )
+    return {
+        "meta": {
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "hash_seed": os.environ.get("PYTHONHASHSEED"),
+            "warmup": warmup,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+# Compare with a saved run.
+#  A case regressed when its median is slower by more than `threshold`
+#  (relative) and `min_delta` seconds, or its counters changed.
+# return: the regressions, as messages
+def compare(
+    current: dict, baseline: dict, threshold: float, min_delta: float
+) -> list[str]:
+    regressions = []
+    base_results = baseline["results"]
+    print(f"\n{'baseline':>9} {'current':>9} {'ratio':>6}  case")
+    for key, r in current["results"].items():
+        b = base_results.get(key)
+        if b is None:
+            continue
+
+        ratio = r["median"] / b["median"] if b["median"] > 0 else 1.0
+        slower = ratio > 1 + threshold and r["median"] - b["median"] > min_delta
+        changed = [
+            c for c in ["nodes", "fails", "solutions"] if r.get(c) != b.get(c)
+        ]
+
+        flag = ""
+        if slower:
+            flag = "  SLOWER"
+            regressions.append(f"{key}: {ratio:.2f}x slower")
+        if changed:
+            flag += "  COUNTERS: " + ", ".join(changed)
+            regressions.append(f"{key}: counters changed: {', '.join(changed)}")
+        print(f"{b['median']:9.4f} {r['median']:9.4f} {ratio:6.2f}  {key}{flag}")
+    return regressions
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Solver benchmark suite")
+    parser.add_argument("-k", dest="keywords", action="append", default=[],
+                        help="only the cases containing this, repeatable")  # fmt: skip
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="compare with this results file")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="relative slowdown considered a regression")  # fmt: skip
+    parser.add_argument("--min-delta", type=float, default=0.001,
+                        help="ignore slowdowns below this, in seconds")  # fmt: skip
+    args = parser.parse_args(argv)
+
+    current = run_suite(args.keywords, args.warmup, args.repeat)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(current, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold, args.min_delta)
+        if regressions:
+            print("\nRegressions:")
+            for msg in regressions:
+                print(f"  {msg}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    if os.environ.get("PYTHONHASHSEED") != HASH_SEED:
+        os.environ["PYTHONHASHSEED"] = HASH_SEED
+        os.execv(sys.executable, [sys.executable] + sys.argv)
+    sys.exit(main(sys.argv[1:]))
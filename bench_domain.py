@@ -0,0 +1,43 @@
+from datetime import datetime
+from statistics import median
+
+from domain import Domain
+from domain_bitset import BitsetDomain
+from alphametics import parse_question
+
+# Compares the domain implementations on the alphametics,
+#  each puzzle is solved for all solutions `REPEAT` times.
+#
+#   python bench_domain.py
+
+REPEAT = 3
+
+questions = [
+    "SEND + MORE = MONEY",
+    "HE + SEES + THE == LIGHT",
+    "AND + A + STRONG + OFFENSE + AS + A + GOOD == DEFENSE",
+    "SO + MANY + MORE + MEN + SEEM + TO + SAY + THAT + THEY + MAY + SOON + TRY + TO + STAY + AT + HOME +  SO + AS + TO + SEE + OR + HEAR + THE + SAME + ONE + MAN + TRY + TO + MEET + THE + TEAM + ON + THE + MOON + AS + HE + HAS + AT + THE + OTHER + TEN == TESTS",
+    "TEN + HERONS + REST + NEAR + NORTH + SEA + SHORE + AS + TAN + TERNS + SOAR + TO + ENTER + THERE + AS + HERONS + NEST + ON + STONES + AT + SHORE + THREE + STARS + ARE + SEEN + TERN + SNORES + ARE + NEAR == SEVVOTH",
+]
+
+
+def bench(question: str, domain_type: type) -> float:
+    costs = []
+    for _ in range(REPEAT):
+        solver = parse_question(question, domain_type)
+        solver.find_all = True
+
+        st = datetime.now()
+        solver.solve()
+        et = datetime.now()
+
+        costs.append((et - st).total_seconds())
+    return median(costs)
+
+
+if __name__ == "__main__":
+    print(f"{'Domain':>10} {'Bitset':>10}  question")
+    for question in questions:
+        t1 = bench(question, Domain)
+        t2 = bench(question, BitsetDomain)
+        print(f"{t1:10.4f} {t2:10.4f}  {question[:40]}")
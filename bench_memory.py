@@ -0,0 +1,64 @@
+import gc
+import tracemalloc
+from time import perf_counter
+
+from constraint import AllUnique, SumUp
+from solver import BTSolver
+from variable import Variable
+
+# Memory used by a model, measured with tracemalloc, and the time to build
+#  it: n variables, the pairwise `AllUnique` (n*(n-1)/2 `NotEqual`) and a
+#  `SumUp` over all of them.
+#
+#   python bench_memory.py
+
+SIZES = [100, 200, 400, 800]
+
+
+def build(n: int) -> BTSolver:
+    solver = BTSolver()
+    xs = [Variable(f"x{i}", list(range(10))) for i in range(n)]
+    solver.add_variables(xs)
+    solver.add_constraints(AllUnique(xs, consistency="pairwise"))
+    solver.add_constraint(SumUp(xs, [1] * n, [], []))
+    return solver
+
+
+# return: bytes allocated by `fn()` and still alive, and its result
+def measure(fn):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = fn()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, result
+
+
+def variable_bytes(n: int) -> float:
+    def fn():
+        return [Variable(f"x{i}", list(range(10))) for i in range(n)]
+
+    size, _ = measure(fn)
+    return size / n
+
+
+if __name__ == "__main__":
+    print(
+        f"{'variables':>10} {'constraints':>12} {'build s':>8} {'total MB':>9} "
+        f"{'B/var':>7} {'B/constraint':>13}"
+    )
+    for n in SIZES:
+        st = perf_counter()
+        build(n)
+        seconds = perf_counter() - st
+
+        total, solver = measure(lambda: build(n))
+        per_var = variable_bytes(n)
+        n_cons = len(solver.constraints)
+        per_cons = (total - per_var * n) / n_cons
+        print(
+            f"{n:10} {n_cons:12} {seconds:8.3f} {total / 1e6:9.2f} "
+            f"{per_var:7.0f} {per_cons:13.0f}"
+        )
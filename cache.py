@@ -0,0 +1,76 @@
+from collections import OrderedDict
+
+from alphametics import canonical, canonical_letter, parse_question
+from compiled import CompiledModel, compile_model
+
+# Cache of alphametic models by canonical form, see `canonical()`.
+#
+# Puzzles with the same letter pattern share one compiled model, and
+#  optionally its solutions, the solutions are mapped back to the letters of
+#  each puzzle. Both caches are LRU with a bounded number of entries.
+#
+#   cache = PuzzleCache()
+#   cache.solve("SEND + MORE = MONEY")   # builds, compiles and solves
+#   cache.solve("TAXI + CBLA = CBXAZ")   # same pattern, no search
+
+
+class PuzzleCache:
+    def __init__(self, max_models: int = 128, max_results: int = 1024):
+        self.max_models = max_models
+        self.max_results = max_results  # 0: don't cache solutions
+        self.models = OrderedDict[str, CompiledModel]()
+        self.results = OrderedDict[tuple[str, bool], list[dict[str, int]]]()
+
+        # statistics
+        self.model_hits = 0
+        self.model_misses = 0
+        self.result_hits = 0
+        self.result_misses = 0
+
+    def model(self, key: str) -> CompiledModel:
+        model = self.models.get(key)
+        if model is not None:
+            self.models.move_to_end(key)
+            self.model_hits += 1
+            return model
+
+        self.model_misses += 1
+        model = compile_model(parse_question(key))
+        self.models[key] = model
+        if len(self.models) > self.max_models:
+            self.models.popitem(last=False)
+        return model
+
+    def solve(self, question: str, find_all: bool = False) -> list[dict[str, int]]:
+        key, letters = canonical(question)
+
+        solutions = self.results.get((key, find_all))
+        if solutions is not None:
+            self.results.move_to_end((key, find_all))
+            self.result_hits += 1
+        else:
+            self.result_misses += 1
+            solutions = self.model(key).solve(find_all)
+            if self.max_results > 0:
+                self.results[(key, find_all)] = solutions
+                if len(self.results) > self.max_results:
+                    self.results.popitem(last=False)
+
+        return [rename(s, letters) for s in solutions]
+
+    def stats(self) -> dict:
+        return {
+            "models": len(self.models),
+            "results": len(self.results),
+            "model_hits": self.model_hits,
+            "model_misses": self.model_misses,
+            "result_hits": self.result_hits,
+            "result_misses": self.result_misses,
+        }
+
+
+# Map a solution of the canonical puzzle back to the original letters,
+#  the carries keep their names.
+def rename(solution: dict[str, int], letters: list[str]) -> dict[str, int]:
+    back = {canonical_letter(i): ch for i, ch in enumerate(letters)}
+    return {back.get(name, name): val for name, val in solution.items()}
@@ -0,0 +1,384 @@
+from constraint import AllDifferent, Equal, LessThan, NotEqual, SumUp
+
+# A frozen, flat copy of a `BTSolver` model with its own search engine.
+#
+# The object model (`Variable`, `Domain`, constraint objects) is
+#  convenient to build, but the search pays for it with attribute lookups
+#  everywhere. `compile_model()` lays the model out as lists of ints:
+#
+#  - domains: one bit mask per variable, bit i is the value `base + i`
+#  - constraints, CSR: the scope of constraint `cid` is
+#      vids[starts[cid]:starts[cid + 1]], with `coeffs` alongside
+#  - incidence, CSR: the constraints of variable `vid` are
+#      var_cids[var_starts[vid]:var_starts[vid + 1]]
+#
+# The model is never modified by a search, each search copies the initial
+#  masks, so it's compiled once and solved many times:
+#
+#   model = compile_model(parse_question("SEND + MORE = MONEY"))
+#   model.solve()                  # [{'S': 9, 'E': 5, ...}]
+#   model.count()
+#   model.solve(assumptions=[(0, 9)])
+#
+# Supported constraints: LessThan, Equal, NotEqual, AllDifferent and SumUp.
+#  AllDifferent removes the values of fixed variables and fails when the
+#  variables have fewer values than themselves, it's weaker than the
+#  matching filtering of `AllDifferent`, the solutions are the same.
+
+KIND_LESS = 0  # x + gap <= y, coeffs: [gap, 0]
+KIND_EQUAL = 1
+KIND_NOT_EQUAL = 2
+KIND_ALL_DIFFERENT = 3
+KIND_LINEAR = 4  # sum(coeff * x) == 0
+
+
+def compile_model(solver) -> "CompiledModel":
+    return CompiledModel(solver)
+
+
+class CompiledModel:
+    def __init__(self, solver):
+        variables = solver.variables
+        self.names = [v.name for v in variables]
+        n = len(variables)
+
+        # ---------------- domains ----------------
+        values = [list(v.domain.values()) for v in variables]
+        self.base = min((min(vals) for vals in values if vals), default=0)
+        self.initial = list[int]()
+        for vals in values:
+            mask = 0
+            for val in vals:
+                mask |= 1 << (val - self.base)
+            self.initial.append(mask)
+
+        # ---------------- constraints ----------------
+        self.kinds = list[int]()
+        self.starts = [0]
+        self.vids = list[int]()
+        self.coeffs = list[int]()
+        for c in solver.constraints:
+            kind, vids, coeffs = flatten(c)
+            self.kinds.append(kind)
+            self.vids.extend(vids)
+            self.coeffs.extend(coeffs)
+            self.starts.append(len(self.vids))
+
+        # ---------------- incidence ----------------
+        degree = [0] * n
+        for vid in self.vids:
+            degree[vid] += 1
+        self.var_starts = [0] * (n + 1)
+        for vid in range(n):
+            self.var_starts[vid + 1] = self.var_starts[vid] + degree[vid]
+        self.var_cids = [0] * len(self.vids)
+        fill = self.var_starts[:n]
+        for cid in range(len(self.kinds)):
+            for k in range(self.starts[cid], self.starts[cid + 1]):
+                vid = self.vids[k]
+                self.var_cids[fill[vid]] = cid
+                fill[vid] += 1
+
+        # per variable / constraint views of the CSR arrays, for the engine
+        self.incidence = [
+            tuple(self.var_cids[self.var_starts[vid] : self.var_starts[vid + 1]])
+            for vid in range(n)
+        ]
+        self.scopes = [
+            tuple(self.vids[self.starts[cid] : self.starts[cid + 1]])
+            for cid in range(len(self.kinds))
+        ]
+        self.terms = [
+            tuple(zip(self.scopes[cid], self.coeffs[self.starts[cid] : self.starts[cid + 1]]))
+            for cid in range(len(self.kinds))
+        ]  # fmt: skip
+        self.degree = degree
+        self.propagators = [
+            [self.less, self.equal, self.not_equal, self.all_different, self.linear][k]
+            for k in self.kinds
+        ]
+
+        # of the last search
+        self.nodes = 0
+        self.fails = 0
+
+    def __len__(self):
+        return len(self.names)
+
+    # ---------------- search ----------------
+
+    def solve(
+        self,
+        find_all: bool = False,
+        assumptions: list[tuple[int, int]] = (),
+    ) -> list[dict[str, int]]:
+        limit = None if find_all else 1
+        return list(self.solve_iter(assumptions, limit))
+
+    def count(
+        self, limit: int | None = None, assumptions: list[tuple[int, int]] = ()
+    ) -> int:
+        found = 0
+        for _ in self.search(assumptions):
+            found += 1
+            if limit is not None and found >= limit:
+                break
+        return found
+
+    def solve_iter(
+        self, assumptions: list[tuple[int, int]] = (), limit: int | None = None
+    ):
+        if limit is not None and limit <= 0:
+            return
+        found = 0
+        for doms in self.search(assumptions):
+            yield self.solution(doms)
+            found += 1
+            if limit is not None and found >= limit:
+                return
+
+    def solution(self, doms: list[int]) -> dict[str, int]:
+        base = self.base
+        return {name: m.bit_length() - 1 + base for name, m in zip(self.names, doms)}
+
+    # Yield the domains at every solution
+    def search(self, assumptions: list[tuple[int, int]] = ()):
+        self.nodes = 0
+        self.fails = 0
+        doms = self.initial[:]
+        for vid, val in assumptions:
+            if val < self.base:  # not in any domain
+                return
+            doms[vid] &= 1 << (val - self.base)
+            if doms[vid] == 0:
+                return
+
+        if any(m == 0 for m in doms):
+            return
+        if not self.propagate(doms, range(len(self.kinds))):
+            return
+        yield from self.dfs(doms)
+
+    def dfs(self, doms: list[int]):
+        # smallest domain first, ties broken by the most constraints
+        best = -1
+        best_key = None
+        degree = self.degree
+        for vid, m in enumerate(doms):
+            if m & (m - 1) == 0:  # fixed
+                continue
+            key = (m.bit_count(), -degree[vid])
+            if best_key is None or key < best_key:
+                best = vid
+                best_key = key
+
+        if best == -1:
+            yield doms
+            return
+
+        m = doms[best]
+        incidence = self.incidence[best]
+        while m:
+            bit = m & -m
+            m ^= bit
+
+            child = doms[:]
+            child[best] = bit
+            self.nodes += 1
+            if self.propagate(child, incidence):
+                yield from self.dfs(child)
+            else:
+                self.fails += 1
+
+    # Run the constraints in `cids` and the ones they wake until nothing
+    #  changes, every propagator is at its own fix point when it returns.
+    # return: feasible or not
+    def propagate(self, doms: list[int], cids) -> bool:
+        queue = list(cids)
+        queued = set(queue)
+        propagators = self.propagators
+        incidence = self.incidence
+        while queue:
+            cid = queue.pop()
+            queued.discard(cid)
+            changed = propagators[cid](doms, cid)
+            if changed is None:
+                return False
+            for vid in changed:
+                for cid2 in incidence[vid]:
+                    if cid2 != cid and cid2 not in queued:
+                        queued.add(cid2)
+                        queue.append(cid2)
+        return True
+
+    # ---------------- propagators ----------------
+    # return: the changed vids, or None if infeasible
+
+    def less(self, doms: list[int], cid: int) -> list[int] | None:
+        (x, gap), (y, _) = self.terms[cid]
+        mx = doms[x]
+        my = doms[y]
+        # x <= max(y) - gap
+        hi = my.bit_length() - 1 - gap
+        nx = mx & ((1 << (hi + 1)) - 1) if hi >= 0 else 0
+        if nx == 0:
+            return None
+        # y >= min(x) + gap
+        lo = (nx & -nx).bit_length() - 1 + gap
+        ny = my & ~((1 << lo) - 1)
+        if ny == 0:
+            return None
+
+        changed = []
+        if nx != mx:
+            doms[x] = nx
+            changed.append(x)
+        if ny != my:
+            doms[y] = ny
+            changed.append(y)
+        return changed
+
+    def equal(self, doms: list[int], cid: int) -> list[int] | None:
+        x, y = self.scopes[cid]
+        common = doms[x] & doms[y]
+        if common == 0:
+            return None
+
+        changed = []
+        if doms[x] != common:
+            doms[x] = common
+            changed.append(x)
+        if doms[y] != common:
+            doms[y] = common
+            changed.append(y)
+        return changed
+
+    def not_equal(self, doms: list[int], cid: int) -> list[int] | None:
+        x, y = self.scopes[cid]
+        mx = doms[x]
+        my = doms[y]
+        if mx & (mx - 1) == 0 and my & mx:
+            my &= ~mx
+            if my == 0:
+                return None
+            doms[y] = my
+            return [y]
+        if my & (my - 1) == 0 and mx & my:
+            mx &= ~my
+            if mx == 0:
+                return None
+            doms[x] = mx
+            return [x]
+        return []
+
+    def all_different(self, doms: list[int], cid: int) -> list[int] | None:
+        scope = self.scopes[cid]
+        changed = []
+        used = 0  # the values of the fixed variables
+        pending = [vid for vid in scope if doms[vid] & (doms[vid] - 1) == 0]
+        while pending:
+            vid = pending.pop()
+            bit = doms[vid]
+            if used & bit:
+                return None  # two variables fixed to the same value
+            used |= bit
+            for vid2 in scope:
+                m = doms[vid2]
+                if vid2 == vid or m & bit == 0:
+                    continue
+                m &= ~bit
+                if m == 0:
+                    return None
+                doms[vid2] = m
+                changed.append(vid2)
+                if m & (m - 1) == 0:
+                    pending.append(vid2)
+
+        union = 0
+        for vid in scope:
+            union |= doms[vid]
+        if union.bit_count() < len(scope):
+            return None
+        return changed
+
+    def linear(self, doms: list[int], cid: int) -> list[int] | None:
+        terms = self.terms[cid]
+        base = self.base
+
+        # the bounds of each coeff * x, and their sums
+        los = []
+        his = []
+        for vid, co in terms:
+            m = doms[vid]
+            lo = ((m & -m).bit_length() - 1 + base) * co
+            hi = (m.bit_length() - 1 + base) * co
+            if co < 0:
+                lo, hi = hi, lo
+            los.append(lo)
+            his.append(hi)
+        smin = sum(los)
+        smax = sum(his)
+
+        changed = set[int]()
+        while True:
+            if smin > 0 or smax < 0:
+                return None
+
+            pruned = False
+            for i, (vid, co) in enumerate(terms):
+                # coeff * x = -(the others)
+                tlo = his[i] - smax
+                thi = los[i] - smin
+                if co > 0:
+                    xlo = -(-tlo // co)
+                    xhi = thi // co
+                else:
+                    xlo = -(-thi // co)
+                    xhi = tlo // co
+
+                m = doms[vid]
+                nm = m
+                if xhi - base < nm.bit_length() - 1:
+                    nm &= (1 << (xhi - base + 1)) - 1 if xhi >= base else 0
+                if xlo > base:
+                    nm &= ~((1 << (xlo - base)) - 1)
+                if nm == m:
+                    continue
+                if nm == 0:
+                    return None
+
+                doms[vid] = nm
+                changed.add(vid)
+                pruned = True
+                lo = ((nm & -nm).bit_length() - 1 + base) * co
+                hi = (nm.bit_length() - 1 + base) * co
+                if co < 0:
+                    lo, hi = hi, lo
+                smin += lo - los[i]
+                smax += hi - his[i]
+                los[i] = lo
+                his[i] = hi
+
+            if not pruned:
+                return list(changed)
+
+
+# return: (kind, scope, coeffs) of a constraint
+def flatten(c) -> tuple[int, list[int], list[int]]:
+    if isinstance(c, LessThan):
+        # `include_equal=True` is the strict one, see `LessThan.prune()`
+        gap = 1 if c.include_equal else 0
+        return KIND_LESS, [c.vid1, c.vid2], [gap, 0]
+    if isinstance(c, Equal):
+        return KIND_EQUAL, [c.vid1, c.vid2], [0, 0]
+    if isinstance(c, NotEqual):
+        return KIND_NOT_EQUAL, [c.vid1, c.vid2], [0, 0]
+    if isinstance(c, AllDifferent):
+        return KIND_ALL_DIFFERENT, list(c.vids), [0] * len(c.vids)
+    if isinstance(c, SumUp):
+        return (
+            KIND_LINEAR,
+            c.lvids + c.rvids,
+            c.lcoeffs + [-co for co in c.rcoeffs],
+        )
+    raise TypeError(f"can't compile {type(c).__name__}: {c}")
@@ -1,15 +1,38 @@
 from abc import ABC, abstractmethod
 from webbrowser import open_new_tab
 from variable import Variable
+from domain_bitset import BitsetDomain
+from domain_interval import IntervalDomain
+from event import EVT_DOMAIN, EVT_BOUND, EVT_FIX
+from scheduler import PRIORITY_BINARY, PRIORITY_LINEAR, PRIORITY_GLOBAL
 import itertools
 from util import exclude
 
+try:
+    import numpy as np
+except ImportError:  # optional, `SumUp` stays scalar
+    np = None
+
 
 # The very tiny constraint solver:
 #  https://choco-solver.org/tinytiny/
 
 
 class Constraint(ABC):
+    # names: the solver's name table, vid -> name, set by `add_constraint()`
+    __slots__ = ("cid", "names")
+
+    # The weakest event that can make `prune()` remove something,
+    #  the solver only wakes the constraint for it, see "event.py"
+    events = EVT_DOMAIN
+
+    # The cost class, cheaper constraints are propagated first, see "scheduler.py"
+    priority = PRIORITY_GLOBAL
+
+    # True if a second `prune()` right after the first one can't remove
+    #  anything, then the constraint isn't woken by its own changes.
+    idempotent = False
+
     @abstractmethod
     def affected_variables(self) -> set[int]:
         pass
@@ -28,23 +51,31 @@ class Constraint(ABC):
     def __repr__(self):
         pass
 
+    # The name of variable `vid` for `__repr__()`
+    def name(self, vid: int) -> str:
+        names = getattr(self, "names", None)
+        if names is None or vid >= len(names):
+            return f"x{vid}"
+        return names[vid]
+
 
 class LessThan(Constraint):
+    __slots__ = ("vid1", "vid2", "include_equal")
+    events = EVT_BOUND
+    priority = PRIORITY_BINARY
+    idempotent = True
+
     def __init__(self, v1, v2, include_equal: bool = False):
         self.vid1 = v1.vid
         self.vid2 = v2.vid
-        self.name_map = {
-            v1.vid: v1.name,
-            v2.vid: v2.name,
-        }
         self.include_equal = include_equal
 
     def affected_variables(self) -> set[int]:
         return {self.vid1, self.vid2}
 
     def __repr__(self):
-        n1 = self.name_map[self.vid1]
-        n2 = self.name_map[self.vid2]
+        n1 = self.name(self.vid1)
+        n2 = self.name(self.vid2)
         return f"{n1} < {n2}"
 
     def prune(self, variables: list[Variable]) -> (bool, list[int]):
@@ -59,52 +90,41 @@ class LessThan(Constraint):
         if len1 == 0 or len2 == 0:
             return False, None
 
-        min_d1 = min(d1.values())
-        max_d2 = max(d2.values())
-
-        to_rm_1 = (
-            [i for i, v in enumerate(d1.values()) if v >= max_d2]
-            if self.include_equal
-            else [i for i, v in enumerate(d1.values()) if v > max_d2]
-        )
-        if len(to_rm_1) == len1:  # "domain 1" becomes empty...
-            return False, None
-        to_rm_2 = (
-            [i for i, v in enumerate(d2.values()) if v <= min_d1]
-            if self.include_equal
-            else [i for i, v in enumerate(d2.values()) if v < min_d1]
-        )
-        if len(to_rm_2) == len2:  # "domain 2" becomes empty...
-            return False, None
-
-        # update variable domains
-        v1.domain.remove(to_rm_1)
-        v2.domain.remove(to_rm_2)
+        # `include_equal` is the strict one
+        gap = 1 if self.include_equal else 0
+        min_d1 = d1.min()
+        max_d2 = d2.max()
 
         # return all changed variables
         changed = []
-        if len(to_rm_1) > 0:
+        feasible, pruned = clamp(d1, min_d1, max_d2 - gap)
+        if not feasible:  # "domain 1" becomes empty...
+            return False, None
+        if pruned:
             changed.append(vid1)
-        if len(to_rm_2) > 0:
+        feasible, pruned = clamp(d2, min_d1 + gap, max_d2)
+        if not feasible:  # "domain 2" becomes empty...
+            return False, None
+        if pruned:
             changed.append(vid2)
         return True, changed
 
 
 class Equal(Constraint):
+    __slots__ = ("vid1", "vid2")
+    priority = PRIORITY_BINARY
+    idempotent = True
+
     def __init__(self, v1, v2):
         self.vid1 = v1.vid
         self.vid2 = v2.vid
-        self.name_map = {
-            v1.vid: v1.name,
-            v2.vid: v2.name,
-        }
 
     def affected_variables(self) -> set[int]:
         return {self.vid1, self.vid2}
 
     def __repr__(self):
-        n1 = self.name_map[self.vid1]
-        n2 = self.name_map[self.vid2]
+        n1 = self.name(self.vid1)
+        n2 = self.name(self.vid2)
         return f"{n1} == {n2}"
 
     def prune(self, variables: list[Variable]) -> (bool, list[int]):
@@ -119,6 +139,11 @@ class Equal(Constraint):
         if len1 == 0 or len2 == 0:
             return False, None
 
+        if isinstance(d1, BitsetDomain) and isinstance(d2, BitsetDomain):
+            return self.prune_bitset(d1, d2)
+        if isinstance(d1, IntervalDomain) or isinstance(d2, IntervalDomain):
+            return self.prune_bounds(d1, d2)
+
         changed = []
 
         set2 = set(d2.values())
@@ -141,22 +166,67 @@ class Equal(Constraint):
 
         return True, changed
 
+    # both domains are bitsets, the intersection is a single `&`
+    def prune_bitset(self, d1: BitsetDomain, d2: BitsetDomain) -> (bool, list[int]):
+        common = d1.mask & d1.aligned_mask(d2)
+        if common == 0:
+            return False, None
+
+        changed = []
+        if d1.intersect(common):
+            changed.append(self.vid1)
+        if d2.intersect(d2.aligned_mask(d1)):
+            changed.append(self.vid2)
+        return True, changed
+
+    # an interval is only pruned at its bounds, the other domain also loses
+    #  the values that aren't in the interval
+    def prune_bounds(self, d1, d2) -> (bool, list[int]):
+        changed = set[int]()
+        while True:
+            lo = max(d1.min(), d2.min())
+            hi = min(d1.max(), d2.max())
+            feasible, pruned1 = clamp(d1, lo, hi)
+            if not feasible:
+                return False, None
+            feasible, pruned2 = clamp(d2, lo, hi)
+            if not feasible:
+                return False, None
+            if pruned1:
+                changed.add(self.vid1)
+            if pruned2:
+                changed.add(self.vid2)
+            if d1.min() == d2.min() and d1.max() == d2.max():
+                break
+
+        for d, other, vid in [(d1, d2, self.vid1), (d2, d1, self.vid2)]:
+            if isinstance(d, IntervalDomain) or not isinstance(other, IntervalDomain):
+                continue
+            to_rm = [i for i, v in enumerate(d.values()) if not other.contains(v)]
+            if len(to_rm) == d.len():  # "domain" becomes empty...
+                return False, None
+            if len(to_rm) > 0:
+                d.remove(to_rm)
+                changed.add(vid)
+        return True, list(changed)
+
 
 class NotEqual(Constraint):
+    __slots__ = ("vid1", "vid2")
+    events = EVT_FIX
+    priority = PRIORITY_BINARY
+    idempotent = True
+
     def __init__(self, v1, v2):
         self.vid1 = v1.vid
         self.vid2 = v2.vid
-        self.name_map = {
-            v1.vid: v1.name,
-            v2.vid: v2.name,
-        }
 
     def affected_variables(self) -> set[int]:
         return {self.vid1, self.vid2}
 
     def __repr__(self):
-        n1 = self.name_map[self.vid1]
-        n2 = self.name_map[self.vid2]
+        n1 = self.name(self.vid1)
+        n2 = self.name(self.vid2)
         return f"{n1} != {n2}"
 
     def prune(self, variables: list[Variable]) -> (bool, list[int]):
@@ -175,7 +245,7 @@ class NotEqual(Constraint):
         changed = []
 
         if len2 == 1:
-            to_rm_1 = [i for i, v in enumerate(d1.values()) if v == d2._values[0]]
+            to_rm_1 = [i for i, v in enumerate(d1.values()) if v == d2.value()]
             if len(to_rm_1) == len1:  # "domain 1" becomes empty...
                 return False, None
             # update variable domains
@@ -184,7 +254,7 @@ class NotEqual(Constraint):
             if len(to_rm_1) > 0:
                 changed.append(vid1)
         if len1 == 1:
-            to_rm_2 = [i for i, v in enumerate(d2.values()) if v == d1._values[0]]
+            to_rm_2 = [i for i, v in enumerate(d2.values()) if v == d1.value()]
             if len(to_rm_2) == len2:  # "domain 2" becomes empty...
                 return False, None
             # update variable domains
@@ -196,7 +266,333 @@ class NotEqual(Constraint):
         return True, changed
 
 
-def AllUnique(variables: list[Variable]) -> list[NotEqual]:
+# All variables take pairwise different values.
+#
+# Instead of n*(n-1)/2 `NotEqual`, this is one global constraint with two
+#  levels of filtering:
+#  - "bounds": Hall intervals, a set of k variables whose domains lie in an
+#     interval of k values consumes that interval, the other variables
+#     can't use its bounds.
+#  - "domain": Régin's matching based filtering, removes every value that
+#     doesn't belong to any maximum matching between variables and values.
+#    https://cdn.aaai.org/AAAI/1994/AAAI94-055.pdf
+class AllDifferent(Constraint):
+    # `events` depends on the consistency, see `__init__()`
+    __slots__ = ("vids", "consistency", "events", "matching")
+    priority = PRIORITY_GLOBAL
+    idempotent = True
+
+    def __init__(self, variables: list[Variable], consistency: str = "domain"):
+        if consistency not in ("bounds", "domain"):
+            raise ValueError(f"unknown consistency: {consistency}")
+
+        self.vids = [v.vid for v in variables]
+        self.consistency = consistency
+        # Hall intervals only depend on the bounds
+        self.events = EVT_BOUND if consistency == "bounds" else EVT_DOMAIN
+        self.matching = dict[int, int]()  # vid -> value, reused as a warm start
+
+    def affected_variables(self) -> set[int]:
+        return set[int](self.vids)
+
+    def __repr__(self):
+        names = ", ".join(self.name(vid) for vid in self.vids)
+        return f"AllDifferent({names})"
+
+    def prune(self, variables: list[Variable]) -> (bool, list[int]):
+        for vid in self.vids:
+            if variables[vid].domain.len() == 0:
+                return False, None
+
+        changed = set[int]()
+
+        if not self.prune_fixed(variables, changed):
+            return False, None
+
+        if self.consistency == "bounds":
+            feasible = self.prune_bounds(variables, changed)
+        else:
+            feasible = self.prune_matching(variables, changed)
+        if not feasible:
+            return False, None
+
+        return True, list(changed)
+
+    # Remove the values of fixed variables from all the others,
+    #  repeat until no new variable gets fixed.
+    def prune_fixed(self, variables: list[Variable], changed: set[int]) -> bool:
+        used = dict[int, int]()  # value -> vid
+        pending = [vid for vid in self.vids if variables[vid].domain.len() == 1]
+
+        while len(pending) > 0:
+            vid = pending.pop()
+            value = next(variables[vid].domain.values())
+            other = used.get(value)
+            if other is not None:
+                if other == vid:
+                    continue
+                return False  # two variables fixed to the same value
+            used[value] = vid
+
+            for vid2 in self.vids:
+                if vid2 == vid:
+                    continue
+                d = variables[vid2].domain
+                to_rm = [i for i, v in enumerate(d.values()) if v == value]
+                if len(to_rm) == 0:
+                    continue
+                if len(to_rm) == d.len():  # "domain" becomes empty...
+                    return False
+                d.remove(to_rm)
+                changed.add(vid2)
+                if d.len() == 1:
+                    pending.append(vid2)
+
+        return True
+
+    # Remove values outside of [lo, hi] from the domain of `vid`
+    def shrink(
+        self, variables: list[Variable], vid: int, lo: int, hi: int, changed: set[int]
+    ) -> bool:
+        d = variables[vid].domain
+        to_rm = [i for i, v in enumerate(d.values()) if v < lo or v > hi]
+        if len(to_rm) == d.len():  # "domain" becomes empty...
+            return False
+        if len(to_rm) > 0:
+            d.remove(to_rm)
+            changed.add(vid)
+        return True
+
+    # Bounds consistency with Hall intervals, O(n^2) per pass.
+    def prune_bounds(self, variables: list[Variable], changed: set[int]) -> bool:
+        vids = self.vids
+        n = len(vids)
+
+        while True:
+            mins = [variables[vid].domain.min() for vid in vids]
+            maxs = [variables[vid].domain.max() for vid in vids]
+
+            # 1. Find all Hall intervals [lo, hi]:
+            #  for a fixed `hi`, walk the variables with max <= hi by
+            #  descending min, `cnt` is the number of variables inside [min, hi]
+            halls = []
+            by_min_desc = sorted(range(n), key=lambda i: -mins[i])
+            for hi in sorted(set(maxs)):
+                cnt = 0
+                for i in by_min_desc:
+                    if maxs[i] > hi:
+                        continue
+                    cnt += 1
+                    lo = mins[i]
+                    if cnt > hi - lo + 1:  # pigeonhole
+                        return False
+                    if cnt == hi - lo + 1:
+                        halls.append((lo, hi))
+
+            # 2. Variables not inside a Hall interval can't take its bounds
+            new_mins = mins.copy()
+            new_maxs = maxs.copy()
+            for lo, hi in halls:
+                for i in range(n):
+                    if lo <= mins[i] and maxs[i] <= hi:  # inside
+                        continue
+                    if lo <= new_mins[i] <= hi:
+                        new_mins[i] = hi + 1
+                    if lo <= new_maxs[i] <= hi:
+                        new_maxs[i] = lo - 1
+
+            shrunk = False
+            for i, vid in enumerate(vids):
+                if new_mins[i] == mins[i] and new_maxs[i] == maxs[i]:
+                    continue
+                if new_mins[i] > new_maxs[i]:
+                    return False
+                if not self.shrink(variables, vid, new_mins[i], new_maxs[i], changed):
+                    return False
+                shrunk = True
+
+            if not shrunk:
+                return True
+
+    # Régin's algorithm:
+    #  1. find a maximum matching between variables and values
+    #  2. orient the graph: matched edges var -> value, others value -> var
+    #  3. an unmatched edge (var, value) is consistent only if both ends are
+    #     in the same strongly connected component (an even alternating cycle)
+    #     or the value is reachable from a free value (an even alternating path)
+    def prune_matching(self, variables: list[Variable], changed: set[int]) -> bool:
+        vids = self.vids
+        n = len(vids)
+        domains = [list(variables[vid].domain.values()) for vid in vids]
+
+        # 1. maximum matching
+        var_to_val = self.max_matching(domains)
+        if var_to_val is None:
+            return False
+
+        # 2. build the directed graph, values are numbered from `n`
+        val_node = dict[int, int]()
+        for dom in domains:
+            for v in dom:
+                if v not in val_node:
+                    val_node[v] = n + len(val_node)
+        num_nodes = n + len(val_node)
+
+        graph = [[] for _ in range(num_nodes)]
+        matched_node = set[int]()
+        for i, dom in enumerate(domains):
+            mv = var_to_val[i]
+            for v in dom:
+                if v == mv:
+                    graph[i].append(val_node[v])
+                    matched_node.add(val_node[v])
+                else:
+                    graph[val_node[v]].append(i)
+
+        # 3.1 nodes reachable from free values
+        reachable = [False] * num_nodes
+        stack = [node for node in range(n, num_nodes) if node not in matched_node]
+        for node in stack:
+            reachable[node] = True
+        while len(stack) > 0:
+            node = stack.pop()
+            for nxt in graph[node]:
+                if not reachable[nxt]:
+                    reachable[nxt] = True
+                    stack.append(nxt)
+
+        # 3.2 strongly connected components
+        scc = strongly_connected_components(graph)
+
+        # 4. remove inconsistent edges
+        for i, vid in enumerate(vids):
+            mv = var_to_val[i]
+            to_rm = [
+                idx
+                for idx, v in enumerate(domains[i])
+                if v != mv
+                and scc[i] != scc[val_node[v]]
+                and not reachable[val_node[v]]
+            ]
+            if len(to_rm) > 0:
+                variables[vid].domain.remove(to_rm)
+                changed.add(vid)
+
+        return True
+
+    # Augmenting path matching, starts from the previous matching if it's
+    #  still valid.
+    # returns: index of variable -> value, or None if some variable can't be matched
+    def max_matching(self, domains: list[list[int]]) -> list[int] | None:
+        n = len(domains)
+        dom_sets = [set(dom) for dom in domains]
+
+        var_to_val = [None] * n
+        val_to_var = dict[int, int]()
+        for i, vid in enumerate(self.vids):
+            v = self.matching.get(vid)
+            if v is not None and v in dom_sets[i] and v not in val_to_var:
+                var_to_val[i] = v
+                val_to_var[v] = i
+
+        for i in range(n):
+            if var_to_val[i] is not None:
+                continue
+            if not self.augment(i, domains, var_to_val, val_to_var):
+                return None
+
+        self.matching = {vid: var_to_val[i] for i, vid in enumerate(self.vids)}
+        return var_to_val
+
+    # Find an alternating path from variable `start` to a free value, iteratively.
+    def augment(
+        self,
+        start: int,
+        domains: list[list[int]],
+        var_to_val: list[int],
+        val_to_var: dict[int, int],
+    ) -> bool:
+        visited = set[int]()  # visited values
+        parent = dict[int, tuple[int, int]]()  # value -> (var, previous value)
+        stack = [(start, None)]
+        while len(stack) > 0:
+            i, prev_val = stack.pop()
+            for v in domains[i]:
+                if v in visited:
+                    continue
+                visited.add(v)
+                parent[v] = (i, prev_val)
+                j = val_to_var.get(v)
+                if j is None:  # free value, flip the path
+                    while v is not None:
+                        i, prev_val = parent[v]
+                        var_to_val[i] = v
+                        val_to_var[v] = i
+                        v = prev_val
+                    return True
+                stack.append((j, v))
+        return False
+
+
+# Iterative Tarjan.
+# returns: the component id of each node
+def strongly_connected_components(graph: list[list[int]]) -> list[int]:
+    num_nodes = len(graph)
+    index = [-1] * num_nodes
+    low = [0] * num_nodes
+    on_stack = [False] * num_nodes
+    comp = [-1] * num_nodes
+    stack = []
+    counter = 0
+    num_comp = 0
+
+    for root in range(num_nodes):
+        if index[root] != -1:
+            continue
+        work = [(root, 0)]
+        while len(work) > 0:
+            node, edge_i = work.pop()
+            if edge_i == 0:
+                index[node] = low[node] = counter
+                counter += 1
+                stack.append(node)
+                on_stack[node] = True
+
+            edges = graph[node]
+            while edge_i < len(edges):
+                nxt = edges[edge_i]
+                edge_i += 1
+                if index[nxt] == -1:
+                    work.append((node, edge_i))
+                    work.append((nxt, 0))
+                    break
+                if on_stack[nxt]:
+                    low[node] = min(low[node], index[nxt])
+            else:
+                if low[node] == index[node]:
+                    while True:
+                        top = stack.pop()
+                        on_stack[top] = False
+                        comp[top] = num_comp
+                        if top == node:
+                            break
+                    num_comp += 1
+                if len(work) > 0:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+
+    return comp
+
+
+# consistency:
+#  - "pairwise": the NotEqual decomposition, n*(n-1)/2 binary constraints
+#  - "bounds" / "domain": a single `AllDifferent`
+def AllUnique(
+    variables: list[Variable], consistency: str = "domain"
+) -> list[Constraint]:
+    if consistency != "pairwise":
+        return [AllDifferent(variables, consistency)]
+
     ret = []
     for i in range(len(variables)):
         for j in range(i + 1, len(variables)):
@@ -206,6 +602,34 @@ def AllUnique(variables: list[Variable]) -> list[NotEqual]:
 
 # 3*x + 2*y + 5*z + ... == 4*a + 6*b + 7*c + ...
 class SumUp(Constraint):
+    __slots__ = (
+        "lvids",
+        "lcoeffs",
+        "rvids",
+        "rcoeffs",
+        "lmins",
+        "lmaxs",
+        "rmins",
+        "rmaxs",
+        "LMIN",
+        "LMAX",
+        "RMIN",
+        "RMAX",
+    )
+    events = EVT_BOUND
+    priority = PRIORITY_LINEAR
+    idempotent = True  # `prune()` loops until nothing changes
+
+    # Wide sums are created as `VectorSumUp` when NumPy is available
+    VECTOR_ARITY = 128
+
+    def __new__(cls, lvars=(), lcoeffs=(), rvars=(), rcoeffs=()):
+        if cls is SumUp and np is not None:
+            arity = len(set(v.vid for v in itertools.chain(lvars, rvars)))
+            if arity >= SumUp.VECTOR_ARITY:
+                cls = VectorSumUp
+        return super().__new__(cls)
+
     # 1. Remove all repeated variables, e.g.:
     #   3x + ... =  x + ...
     #     -> 2x + ... = ...
@@ -253,7 +677,15 @@ class SumUp(Constraint):
                 self.lvids.append(vid)
                 self.lcoeffs.append(co)
 
-        self.name_map = {v.vid: v.name for v in itertools.chain(lvars, rvars)}
+        # cached bounds, see `init_bounds()`
+        self.lmins = None
+        self.lmaxs = None
+        self.rmins = None
+        self.rmaxs = None
+        self.LMIN = 0
+        self.LMAX = 0
+        self.RMIN = 0
+        self.RMAX = 0
 
     def affected_variables(self) -> set[int]:
         return set[int](self.lvids + self.rvids)
@@ -262,7 +694,7 @@ class SumUp(Constraint):
         lterms = " + ".join(
             list(
                 map(
-                    lambda vid, coeff: f"{self.name_map[vid]}*{coeff}",
+                    lambda vid, coeff: f"{self.name(vid)}*{coeff}",
                     self.lvids,
                     self.lcoeffs,
                 )
@@ -271,7 +703,7 @@ class SumUp(Constraint):
         rterms = " + ".join(
             list(
                 map(
-                    lambda vid, scoeff: f"{self.name_map[vid]}*{scoeff}",
+                    lambda vid, scoeff: f"{self.name(vid)}*{scoeff}",
                     self.rvids,
                     self.rcoeffs,
                 )
@@ -285,54 +717,87 @@ class SumUp(Constraint):
     ) -> list[tuple[int, int]]:
         ret = []  # the min, max value of domain Xi
         for vid in vids:
-            var = variables[vid]
-            min_v = 0
-            max_v = 0
-            for i, v in enumerate(var.domain.values()):
-                if i == 0 or v < min_v:
-                    min_v = v
-                if i == 0 or v > max_v:
-                    max_v = v
-            ret.append((min_v, max_v))
+            d = variables[vid].domain
+            ret.append((d.min(), d.max()))
 
         return ret
 
-    # https://youtu.be/SCcOrHzdHxI?t=1446
-    def prune(self, variables: list[Variable]) -> (bool, list[int]):
-        # 1. Get the intersection of left part and right part
+    # The bounds of every term and the sums LMIN/LMAX/RMIN/RMAX are cached
+    #  between calls. On each call only the terms whose domain bounds moved
+    #  (pruned, or restored by backtracking) are applied as a delta.
+    def init_bounds(self, variables: list[Variable]):
         l_min_max = self.min_max_of_each_variable(variables, self.lvids)
         r_min_max = self.min_max_of_each_variable(variables, self.rvids)
+        self.lmins = [mm[0] for mm in l_min_max]
+        self.lmaxs = [mm[1] for mm in l_min_max]
+        self.rmins = [mm[0] for mm in r_min_max]
+        self.rmaxs = [mm[1] for mm in r_min_max]
+
+        self.LMIN = sum(m * co for m, co in zip(self.lmins, self.lcoeffs))
+        self.LMAX = sum(m * co for m, co in zip(self.lmaxs, self.lcoeffs))
+        self.RMIN = sum(m * co for m, co in zip(self.rmins, self.rcoeffs))
+        self.RMAX = sum(m * co for m, co in zip(self.rmaxs, self.rcoeffs))
+
+    # Apply the bound changes of one side to the cached sums.
+    # return: the delta of (min sum, max sum)
+    def sync_bounds(
+        self,
+        variables: list[Variable],
+        vids: list[int],
+        coeffs: list[int],
+        mins: list[int],
+        maxs: list[int],
+    ) -> tuple[int, int]:
+        d_min = 0
+        d_max = 0
+        for i, vid in enumerate(vids):
+            d = variables[vid].domain
+            lo = d.min()
+            hi = d.max()
+            if lo != mins[i]:
+                d_min += (lo - mins[i]) * coeffs[i]
+                mins[i] = lo
+            if hi != maxs[i]:
+                d_max += (hi - maxs[i]) * coeffs[i]
+                maxs[i] = hi
+        return d_min, d_max
 
-        LMIN = 0  # the minimum possible summary of left side
-        LMAX = 0
-        for n in range(len(self.lvids)):
-            LMIN += l_min_max[n][0] * self.lcoeffs[n]
-            LMAX += l_min_max[n][1] * self.lcoeffs[n]
-
-        RMIN = 0  # the minimum possible summary of right side
-        RMAX = 0
-        for n in range(len(self.rvids)):
-            RMIN += r_min_max[n][0] * self.rcoeffs[n]
-            RMAX += r_min_max[n][1] * self.rcoeffs[n]
-
-        # the intersection of left and right side:
-        MIN = max(LMIN, RMIN)
-        MAX = min(LMAX, RMAX)
-
-        if MIN > MAX:
-            return False, None
+    # https://youtu.be/SCcOrHzdHxI?t=1446
+    def prune(self, variables: list[Variable]) -> (bool, list[int]):
+        # 1. Get the intersection of left part and right part
+        if self.lmins is None:
+            self.init_bounds(variables)
+        else:
+            d_min, d_max = self.sync_bounds(
+                variables, self.lvids, self.lcoeffs, self.lmins, self.lmaxs
+            )
+            self.LMIN += d_min
+            self.LMAX += d_max
+            d_min, d_max = self.sync_bounds(
+                variables, self.rvids, self.rcoeffs, self.rmins, self.rmaxs
+            )
+            self.RMIN += d_min
+            self.RMAX += d_max
 
         # Both Left and Right sides should be in range of [MIN, MAX]
         #  MIN <= Left <= MAX
         #  MIN <= Right <= MAX
+        #
+        # Pruning a term tightens the sums, repeat until nothing changes,
+        #  so the constraint is at its own fix point when it returns and
+        #  doesn't need to be woken by its own changes.
 
         changed_vids = set[int]()
 
-        # 2. Prune left_side:
-        for i, vid in enumerate(self.lvids):
-            var = variables[vid]
-            coeff = self.lcoeffs[i]
+        while True:
+            # the intersection of left and right side:
+            MIN = max(self.LMIN, self.RMIN)
+            MAX = min(self.LMAX, self.RMAX)
+
+            if MIN > MAX:
+                return False, None
 
+            # 2. Prune left_side:
             # For min:
             #    co1*X1 + co2*X2 + ... >= MIN
             # -> with: Left = co1*X1 + co2*X2 + ..., if max(Left) if still less than MIN, then it's infeasible
@@ -342,41 +807,313 @@ class SumUp(Constraint):
             #    co1*X1 + co2*X2 + ... <= MAX
             # -> ...
             # -> co1*X1 <= MAX - (min(Left) - co1*Min(X1))
-            to_rm = [
-                rm
-                for rm, v in enumerate(var.domain.values())
-                if coeff * v < (MIN - (LMAX - coeff * l_min_max[i][1]))
-                or coeff * v > (MAX - (LMIN - coeff * l_min_max[i][0]))
-            ]
-            if len(to_rm) == var.domain.len():  # "domain" becomes empty...
+            feasible, l_pruned = self.prune_side(variables, MIN, MAX, True, changed_vids)
+            if not feasible:
                 return False, None
 
-            if len(to_rm) > 0:
-                changed_vids.add(vid)
+            # 2.2 Prune right_side:
+            feasible, r_pruned = self.prune_side(variables, MIN, MAX, False, changed_vids)
+            if not feasible:
+                return False, None
 
-            var.domain.remove(to_rm)
+            if not l_pruned and not r_pruned:
+                break
 
-        # 2.2 Prune right_side:
-        for i, vid in enumerate(self.rvids):
-            var = variables[vid]
-            coeff = self.rcoeffs[i]
+        # TODO:
+        # More accurate pruning
 
-            to_rm = [
-                rm
-                for rm, v in enumerate(var.domain.values())
-                if coeff * v < (MIN - (RMAX - coeff * r_min_max[i][1]))
-                or coeff * v > (MAX - (RMIN - coeff * r_min_max[i][0]))
-            ]
+        return True, list(changed_vids)
+
+    # Prune one side to [MIN, MAX], the cached bounds and sums of that side
+    #  are updated right away, so the following terms get a tighter range.
+    # return: (feasible or not, any domain pruned)
+    def prune_side(
+        self,
+        variables: list[Variable],
+        MIN: int,
+        MAX: int,
+        left: bool,
+        changed_vids: set[int],
+    ) -> (bool, bool):
+        if left:
+            vids, coeffs, mins, maxs = self.lvids, self.lcoeffs, self.lmins, self.lmaxs
+        else:
+            vids, coeffs, mins, maxs = self.rvids, self.rcoeffs, self.rmins, self.rmaxs
+
+        pruned = False
+        for i, vid in enumerate(vids):
+            coeff = coeffs[i]
+            if left:
+                SMIN, SMAX = self.LMIN, self.LMAX
+            else:
+                SMIN, SMAX = self.RMIN, self.RMAX
+            lo = MIN - (SMAX - coeff * maxs[i])
+            hi = MAX - (SMIN - coeff * mins[i])
+
+            # bounds already inside the range, nothing to remove
+            if coeff * mins[i] >= lo and coeff * maxs[i] <= hi:
+                continue
+
+            # coeff > 0: lo <= coeff * v <= hi
+            d = variables[vid].domain
+            feasible, _ = clamp(d, -(-lo // coeff), hi // coeff)
+            if not feasible:  # "domain" becomes empty...
+                return False, False
+
+            changed_vids.add(vid)
+            pruned = True
+
+            new_min = d.min()
+            new_max = d.max()
+            d_min = (new_min - mins[i]) * coeff
+            d_max = (new_max - maxs[i]) * coeff
+            mins[i] = new_min
+            maxs[i] = new_max
+            if left:
+                self.LMIN += d_min
+                self.LMAX += d_max
+            else:
+                self.RMIN += d_min
+                self.RMAX += d_max
+
+        return True, pruned
+
+
+# `SumUp` with the bounds of all terms in NumPy arrays, for wide sums.
+#  Every round computes the allowed range of all terms at once and only the
+#  domains whose bounds move are pruned, until nothing changes. It reaches
+#  the same fix point as `SumUp.prune()`.
+#
+# The bounds are cached between calls like `SumUp.init_bounds()`, in lists
+#  to compare with the domains and in arrays for the rounds. Only the terms
+#  whose bounds moved since the last call are written to the arrays.
+class VectorSumUp(SumUp):
+    __slots__ = ("all_vids", "coeffs", "nl", "mins", "maxs", "amins", "amaxs")
 
-            if len(to_rm) == var.domain.len():  # "domain" becomes empty...
+    def __init__(
+        self,
+        lvars: list[Variable],
+        lcoeffs: list[int],
+        rvars: list[Variable],
+        rcoeffs: list[int],
+    ):
+        super().__init__(lvars, lcoeffs, rvars, rcoeffs)
+        self.all_vids = self.lvids + self.rvids
+        self.coeffs = np.array(self.lcoeffs + self.rcoeffs, dtype=np.int64)
+        self.nl = len(self.lvids)
+
+        # cached bounds, see `sync_all()`
+        self.mins = None
+        self.maxs = None
+        self.amins = None
+        self.amaxs = None
+
+    # Bring the cached bounds up to date with the domains
+    def sync_all(self, variables: list[Variable]):
+        if self.mins is None:
+            domains = [variables[vid].domain for vid in self.all_vids]
+            self.mins = [d.min() for d in domains]
+            self.maxs = [d.max() for d in domains]
+            self.amins = np.array(self.mins, dtype=np.int64)
+            self.amaxs = np.array(self.maxs, dtype=np.int64)
+            return
+
+        mins, maxs = self.mins, self.maxs
+        amins, amaxs = self.amins, self.amaxs
+        for i, vid in enumerate(self.all_vids):
+            d = variables[vid].domain
+            lo = d.min()
+            hi = d.max()
+            if lo != mins[i]:
+                mins[i] = amins[i] = lo
+            if hi != maxs[i]:
+                maxs[i] = amaxs[i] = hi
+
+    def prune(self, variables: list[Variable]) -> (bool, list[int]):
+        self.sync_all(variables)
+        mins, maxs = self.mins, self.maxs
+        amins, amaxs = self.amins, self.amaxs
+
+        coeffs = self.coeffs
+        nl = self.nl
+        n = len(mins)
+        side_min = np.empty(n, dtype=np.int64)
+        side_max = np.empty(n, dtype=np.int64)
+        changed = set[int]()
+
+        while True:
+            lo = coeffs * amins
+            hi = coeffs * amaxs
+            LMIN, RMIN = int(lo[:nl].sum()), int(lo[nl:].sum())
+            LMAX, RMAX = int(hi[:nl].sum()), int(hi[nl:].sum())
+
+            MIN = max(LMIN, RMIN)
+            MAX = min(LMAX, RMAX)
+            if MIN > MAX:
                 return False, None
 
-            if len(to_rm) > 0:
-                changed_vids.add(vid)
+            # the range of each term, as in `prune_side()`
+            side_min[:nl] = LMIN
+            side_min[nl:] = RMIN
+            side_max[:nl] = LMAX
+            side_max[nl:] = RMAX
+            term_lo = MIN - (side_max - hi)
+            term_hi = MAX - (side_min - lo)
+            new_mins = np.maximum(amins, -(-term_lo // coeffs))  # ceil
+            new_maxs = np.minimum(amaxs, term_hi // coeffs)
+
+            moved = np.flatnonzero((new_mins != amins) | (new_maxs != amaxs))
+            if len(moved) == 0:
+                return True, list(changed)
+
+            for i in moved.tolist():
+                vid = self.all_vids[i]
+                d = variables[vid].domain
+                feasible, _ = clamp(d, int(new_mins[i]), int(new_maxs[i]))
+                if not feasible:  # "domain" becomes empty...
+                    return False, None
+                changed.add(vid)
+                mins[i] = amins[i] = d.min()
+                maxs[i] = amaxs[i] = d.max()
+
+
+# (x, y, z) in [(1, 2, 3), (2, 2, 1), ...]
+#
+# Compact table: the valid tuples are the bits of one int, `current`, and
+#  each value of each column has the mask of the tuples that support it.
+#  `prune()`:
+#  1. for every column whose domain shrank since the last call, keeps the
+#     tuples that support one of its values:
+#       current &= supports[x][v1] | supports[x][v2] | ...
+#  2. removes the values that no valid tuple supports:
+#       supports[x][v] & current == 0
+#     it skips the column if it was the only one that changed since a
+#     previous call.
+#  https://arxiv.org/abs/1604.06641
+#
+# `current` is restored with the domains, it's recorded to the solver's
+#  trail like a domain, see "trail.py". Without a trail, e.g. with
+#  `snapshot()` / `rollback()`, it starts over from all tuples every time.
+class Table(Constraint):
+    __slots__ = (
+        "vids",
+        "tuples",
+        "supports",
+        "all",
+        "current",
+        "sizes",
+        "stamp",
+    )
+    priority = PRIORITY_GLOBAL
+    idempotent = True
+
+    vid = -1  # it's not a domain, see `Trail.on_restore`
+
+    def __init__(self, variables: list[Variable], tuples: list[tuple[int, ...]]):
+        self.vids = [v.vid for v in variables]
+        if len(set(self.vids)) != len(self.vids):
+            raise ValueError("Table: a variable appears twice")
+        self.tuples = [tuple(t) for t in tuples]
+        arity = len(self.vids)
+        for t in self.tuples:
+            if len(t) != arity:
+                raise ValueError(f"Table: tuple {t} doesn't have {arity} values")
+
+        # column -> value -> the mask of its tuples
+        nbytes = (len(self.tuples) + 7) // 8
+        self.supports = list[dict[int, int]]()
+        for i in range(arity):
+            rows = dict[int, list[int]]()
+            for row, t in enumerate(self.tuples):
+                rows.setdefault(t[i], []).append(row)
+            self.supports.append({val: mask_of(r, nbytes) for val, r in rows.items()})
+
+        self.all = (1 << len(self.tuples)) - 1
+        self.current = self.all
+        self.sizes = [-1] * arity  # the domain sizes at the last `prune()`
+
+        self.stamp = 0  # see "trail.py"
 
-            var.domain.remove(to_rm)
+    def affected_variables(self) -> set[int]:
+        return set[int](self.vids)
 
-        # TODO:
-        # More accurate pruning
+    def __repr__(self):
+        names = ", ".join(self.name(vid) for vid in self.vids)
+        return f"Table({names}): {len(self.tuples)} tuples"
 
-        return True, list(changed_vids)
+    def save_state(self):
+        return (self.current, self.sizes[:])
+
+    def restore_state(self, state):
+        self.current, self.sizes = state
+
+    def prune(self, variables: list[Variable]) -> (bool, list[int]):
+        domains = [variables[vid].domain for vid in self.vids]
+        trail = domains[0].trail if domains else None
+        if trail is None:  # from scratch
+            self.current = self.all
+            self.sizes = [-1] * len(domains)
+        elif self.stamp != trail.stamp:
+            trail.record(self)
+
+        # 1. update the valid tuples
+        current = self.current
+        sizes = self.sizes
+        shrunk = list[int]()
+        fresh = False  # a column wasn't checked yet, e.g. the first call
+        for i, d in enumerate(domains):
+            size = d.len()
+            if size == sizes[i]:
+                continue
+            shrunk.append(i)
+            fresh = fresh or sizes[i] == -1
+            sizes[i] = size
+            sup = self.supports[i]
+            mask = 0
+            for v in d.values():
+                mask |= sup.get(v, 0)
+            current &= mask
+        self.current = current
+        if current == 0:
+            return False, None
+
+        # 2. remove the unsupported values
+        changed = list[int]()
+        skip = shrunk[0] if len(shrunk) == 1 and not fresh else -1
+        for i, d in enumerate(domains):
+            if i == skip:
+                continue
+            sup = self.supports[i]
+            to_rm = [j for j, v in enumerate(d.values()) if sup.get(v, 0) & current == 0]
+            if len(to_rm) == 0:
+                continue
+            if len(to_rm) == d.len():  # "domain" becomes empty...
+                return False, None
+            d.remove(to_rm)
+            sizes[i] = d.len()
+            changed.append(self.vids[i])
+
+        return True, changed
+
+
+# Remove the values of `d` outside of [lo, hi]
+# return: (feasible or not, any value removed)
+def clamp(d, lo: int, hi: int) -> tuple[bool, bool]:
+    if d.min() >= lo and d.max() <= hi:
+        return True, False
+    if isinstance(d, IntervalDomain):
+        return d.clamp(lo, hi), True
+
+    to_rm = [i for i, v in enumerate(d.values()) if v < lo or v > hi]
+    if len(to_rm) == d.len():
+        return False, False
+    d.remove(to_rm)
+    return True, True
+
+
+# The int with the bits `rows` set
+def mask_of(rows: list[int], nbytes: int) -> int:
+    buf = bytearray(nbytes)
+    for r in rows:
+        buf[r >> 3] |= 1 << (r & 7)
+    return int.from_bytes(buf, "little")
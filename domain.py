@@ -1,4 +1,5 @@
 from itertools import islice
+from event import EVT_DOMAIN, EVT_BOUND, EVT_FIX
 
 # Inspired by this:
 #   https://opensourc.es/blog/constraint-solver-data-structure/
@@ -38,6 +39,20 @@ from itertools import islice
 
 
 class Domain:
+    __slots__ = (
+        "_values",
+        "indices",
+        "recovery",
+        "barrier",
+        "snapshots",
+        "_min",
+        "_max",
+        "vid",
+        "trail",
+        "stamp",
+        "events",
+    )
+
     def __init__(self, values: list[int]):
         self._values = values.copy()
         self.indices = [i for i in range(len(values))]
@@ -45,8 +60,22 @@ class Domain:
         self.barrier = len(values)
         self.snapshots = []
 
+        # Bounds are kept up to date on every removal,
+        #  they are only rescanned when the min or max itself is removed.
+        self._min = min(values) if len(values) > 0 else 0
+        self._max = max(values) if len(values) > 0 else 0
+
+        self.vid = -1  # set by the solver
+
+        # see "trail.py"
+        self.trail = None
+        self.stamp = 0
+
+        # events fired since the solver last read them, see "event.py"
+        self.events = 0
+
     def __str__(self):
-        return f"values: {self._values}\nbarrier: {self.barrier}\nindices: {self.indices}\nrecovery: {self.recovery}"
+        return f"values: {self._values}\nbarrier: {self.barrier}\nmin: {self._min}\nmax: {self._max}\nindices: {self.indices}\nrecovery: {self.recovery}"
 
     def values(self):
         return islice(self._values, self.barrier)
@@ -54,17 +83,73 @@ class Domain:
     def len(self):
         return self.barrier
 
+    def min(self):
+        return self._min
+
+    def max(self):
+        return self._max
+
+    # the value of a fixed domain
+    def value(self):
+        return self._values[0]
+
+    def contains(self, value: int) -> bool:
+        return self._min <= value <= self._max and value in self.values()
+
     def snapshot(self):
-        self.snapshots.append(self.barrier)
+        self.snapshots.append((self.barrier, self._min, self._max))
 
     def rollback(self):
-        b = self.snapshots.pop()
+        b, self._min, self._max = self.snapshots.pop()
         while self.barrier < b:
             self.recover_1()
 
-    def remove(self, to_rm: list[int]):
+    def save_state(self):
+        return (self.barrier, self._min, self._max)
+
+    def restore_state(self, state):
+        b, self._min, self._max = state
+        while self.barrier < b:
+            self.recover_1()
+        self.events = 0
+
+    # return: the events fired
+    def remove(self, to_rm: list[int]) -> int:
+        if len(to_rm) == 0:
+            return 0
+        trail = self.trail
+        if trail is not None and self.stamp != trail.stamp:
+            trail.record(self)
+
+        events = EVT_DOMAIN
+        bound_removed = False
         for i in to_rm:
-            self.remove_at(i)
+            v = self.remove_at(i)
+            if v == self._min or v == self._max:
+                bound_removed = True
+        if bound_removed:
+            self.update_bounds()
+            events |= EVT_BOUND
+        if self.barrier == 1:
+            events |= EVT_FIX
+
+        self.events |= events
+        return events
+
+    # rescan the remaining values for min and max
+    def update_bounds(self):
+        if self.barrier == 0:
+            return
+        values = self._values
+        lo = hi = values[0]
+        for i in range(1, self.barrier):
+            v = values[i]
+            if v < lo:
+                lo = v
+            elif v > hi:
+                hi = v
+        self._min = lo
+        self._max = hi
 
     #  A B C D E F|
     #  0 1 2 3 4 5|
@@ -94,7 +179,10 @@ class Domain:
     #    A B|E F D C
     #    0 1|5 4 2 3
     #    0 0|2 2 3 2
-    def remove_at(self, i: int):
+    #
+    # It doesn't update min/max or record to the trail, use `remove()` for that.
+    # return: the removed value
+    def remove_at(self, i: int) -> int:
         self.barrier -= 1
         b = self.barrier
 
@@ -106,6 +194,7 @@ class Domain:
         self.swap_value(i, b)
         self.swap_index(self.indices[i], self.indices[b])
         self.recovery[b] = i
+        return self._values[b]
 
     def recover_1(self):
         b = self.barrier
@@ -121,14 +210,23 @@ class Domain:
     def swap_index(self, i: int, j: int):
         self.indices[i], self.indices[j] = self.indices[j], self.indices[i]
 
+    # Remove all values except `value`
+    # return: the events fired
+    def assign(self, value) -> int:
+        return self.remove([i for i, v in enumerate(self.values()) if v != value])
+
     def temp_assign(self, value):
+        if self.barrier > 1:
+            self.events |= EVT_DOMAIN | EVT_BOUND | EVT_FIX
         v0 = self._values[0]
         self._values[0] = value
         barr = self.barrier
         self.barrier = 1
-        return (v0, barr)
+        lo, hi = self._min, self._max
+        self._min = self._max = value
+        return (v0, barr, lo, hi)
 
     def temp_restore(self, tup):
-        value, barrier = tup
+        value, barrier, self._min, self._max = tup
         self._values[0] = value
         self.barrier = barrier
@@ -0,0 +1,160 @@
+# The domain is stored as the bits of a python int:
+#  bit i is set if the value `offset + i` is in the domain.
+#
+#  values: 2 3 5 7, offset: 2
+#
+#  bit:    5 4 3 2 1 0
+#  mask:   1 0 1 0 1 1
+#
+# - min/max/len are bit operations
+# - a snapshot is a single int
+# - intersecting 2 domains is a single `&`
+#
+# It has the same interface as `Domain`, positions passed to `remove()`
+#  are the positions in `values()`, which iterates from low to high.
+
+from event import EVT_DOMAIN, EVT_BOUND, EVT_FIX
+
+
+class BitsetDomain:
+    __slots__ = ("offset", "mask", "snapshots", "vid", "trail", "stamp", "events")
+
+    def __init__(self, values: list[int]):
+        self.offset = min(values) if len(values) > 0 else 0
+        self.mask = 0
+        for v in values:
+            self.mask |= 1 << (v - self.offset)
+        self.snapshots = []
+
+        self.vid = -1  # set by the solver
+
+        # see "trail.py"
+        self.trail = None
+        self.stamp = 0
+
+        # events fired since the solver last read them, see "event.py"
+        self.events = 0
+
+    def __str__(self):
+        return f"values: {list(self.values())}\noffset: {self.offset}\nmask: {self.mask:b}"
+
+    def values(self):
+        m = self.mask
+        offset = self.offset
+        while m:
+            low = m & -m
+            yield low.bit_length() - 1 + offset
+            m ^= low
+
+    def len(self):
+        return self.mask.bit_count()
+
+    def min(self):
+        m = self.mask
+        return (m & -m).bit_length() - 1 + self.offset
+
+    def max(self):
+        return self.mask.bit_length() - 1 + self.offset
+
+    # the value of a fixed domain
+    def value(self):
+        return self.min()
+
+    def contains(self, value: int) -> bool:
+        i = value - self.offset
+        return i >= 0 and (self.mask >> i) & 1 == 1
+
+    # the mask of `other` shifted to the offset of this domain
+    def aligned_mask(self, other: "BitsetDomain") -> int:
+        shift = other.offset - self.offset
+        if shift >= 0:
+            return other.mask << shift
+        return other.mask >> -shift
+
+    def snapshot(self):
+        self.snapshots.append(self.mask)
+
+    def rollback(self):
+        self.mask = self.snapshots.pop()
+
+    def save_state(self):
+        return self.mask
+
+    def restore_state(self, mask):
+        self.mask = mask
+        self.events = 0
+
+    def save(self):
+        trail = self.trail
+        if trail is not None and self.stamp != trail.stamp:
+            trail.record(self)
+
+    # Set the new mask and fire the events of the change
+    # return: the events fired
+    def update(self, new_mask: int) -> int:
+        old_mask = self.mask
+        self.save()
+        self.mask = new_mask
+
+        events = EVT_DOMAIN
+        if (new_mask & -new_mask) != (old_mask & -old_mask) or (
+            new_mask.bit_length() != old_mask.bit_length()
+        ):
+            events |= EVT_BOUND
+        if new_mask & (new_mask - 1) == 0:
+            events |= EVT_FIX
+
+        self.events |= events
+        return events
+
+    # return: the events fired
+    def remove(self, to_rm: list[int]) -> int:
+        if len(to_rm) == 0:
+            return 0
+        rm = set(to_rm)
+        clear = 0
+        m = self.mask
+        pos = 0
+        while m:
+            low = m & -m
+            if pos in rm:
+                clear |= low
+            m ^= low
+            pos += 1
+        return self.update(self.mask & ~clear)
+
+    # It doesn't record to the trail, use `remove()` for that.
+    def remove_at(self, i: int) -> int:
+        m = self.mask
+        for _ in range(i):
+            m &= m - 1
+        low = m & -m
+        self.mask ^= low
+        return low.bit_length() - 1 + self.offset
+
+    # Keep only the values in `mask` (aligned to this domain).
+    # return: changed or not
+    def intersect(self, mask: int) -> bool:
+        new_mask = self.mask & mask
+        if new_mask == self.mask:
+            return False
+        self.update(new_mask)
+        return True
+
+    # Remove all values except `value`
+    # return: the events fired
+    def assign(self, value) -> int:
+        new_mask = 1 << (value - self.offset)
+        if new_mask == self.mask:
+            return 0
+        return self.update(new_mask)
+
+    def temp_assign(self, value):
+        prev = self.mask
+        if prev & (prev - 1):
+            self.events |= EVT_DOMAIN | EVT_BOUND | EVT_FIX
+        self.mask = 1 << (value - self.offset)
+        return prev
+
+    def temp_restore(self, mask):
+        self.mask = mask
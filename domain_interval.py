@@ -0,0 +1,208 @@
+# The domain is stored as its bounds, plus the values removed in between:
+#
+#  values: 0 1 2 4 5 ... 1000000
+#  lo: 0, hi: 1000000, holes: {3}
+#
+# - min/max/len are O(1), the bounds move in O(1) when there are no holes
+# - `clamp()` removes the values outside a range, it's what the bounds
+#    reasoning of `LessThan`, `Equal` and `SumUp` uses
+# - a snapshot is (lo, hi, len, the number of holes)
+#
+# Holes are appended to `log` and added to `holes`, restoring a state
+#  drops the ones added after it. Holes outside [lo, hi] are kept, they're
+#  never counted.
+#
+# It never switches to the full representation: a model that removes many
+#  values from the middle of a domain keeps them all in `holes`, i.e. it
+#  takes O(|D|) memory like `Domain`. It's for domains pruned mostly by
+#  their bounds.
+#
+# It has the methods of `Domain` the solver and the constraints use,
+#  including `temp_assign()` / `temp_restore()`. Positions passed to
+#  `remove()` are the positions in `values()`, which iterates from low to
+#  high. Other constraints go through `values()`, which costs O(|D|).
+
+from event import EVT_DOMAIN, EVT_BOUND, EVT_FIX
+
+
+class IntervalDomain:
+    __slots__ = (
+        "lo",
+        "hi",
+        "size",
+        "holes",
+        "log",
+        "snapshots",
+        "vid",
+        "trail",
+        "stamp",
+        "events",
+    )
+
+    # values: a `range`, or the values, anything missing in between is a hole
+    def __init__(self, values):
+        if isinstance(values, range) and values.step == 1:
+            self.lo = values.start
+            self.hi = values.stop - 1
+        else:
+            values = set(values)
+            self.lo = min(values) if len(values) > 0 else 0
+            self.hi = max(values) if len(values) > 0 else -1
+        self.size = max(self.hi - self.lo + 1, 0)
+        self.holes = set[int]()
+        self.log = list[int]()
+        self.snapshots = []
+
+        self.vid = -1  # set by the solver
+
+        # see "trail.py"
+        self.trail = None
+        self.stamp = 0
+
+        # events fired since the solver last read them, see "event.py"
+        self.events = 0
+
+        if not isinstance(values, range):
+            self.remove_values(v for v in range(self.lo, self.hi + 1) if v not in values)
+            self.events = 0
+
+    def __str__(self):
+        return f"lo: {self.lo}\nhi: {self.hi}\nlen: {self.size}\nholes: {sorted(self.holes)}"
+
+    def values(self):
+        if self.size == self.hi - self.lo + 1:
+            return iter(range(self.lo, self.hi + 1))
+        holes = self.holes
+        return (v for v in range(self.lo, self.hi + 1) if v not in holes)
+
+    def len(self):
+        return self.size
+
+    def min(self):
+        return self.lo
+
+    def max(self):
+        return self.hi
+
+    # the value of a fixed domain
+    def value(self):
+        return self.lo
+
+    def contains(self, value: int) -> bool:
+        return self.lo <= value <= self.hi and value not in self.holes
+
+    def snapshot(self):
+        self.snapshots.append(self.save_state())
+
+    def rollback(self):
+        self.restore_state(self.snapshots.pop())
+
+    def save_state(self):
+        return (self.lo, self.hi, self.size, len(self.log))
+
+    def restore_state(self, state):
+        self.lo, self.hi, self.size, n = state
+        log = self.log
+        while len(log) > n:
+            self.holes.discard(log.pop())
+        self.events = 0
+
+    def save(self):
+        trail = self.trail
+        if trail is not None and self.stamp != trail.stamp:
+            trail.record(self)
+
+    # return: the events fired
+    def remove(self, to_rm: list[int]) -> int:
+        if len(to_rm) == 0:
+            return 0
+        if self.size == self.hi - self.lo + 1:  # no holes, position i is lo + i
+            return self.remove_values([self.lo + i for i in to_rm])
+        rm = set(to_rm)
+        return self.remove_values(v for i, v in enumerate(self.values()) if i in rm)
+
+    # Remove `values`, they must be in the domain
+    # return: the events fired
+    def remove_values(self, values) -> int:
+        self.save()
+        lo = self.lo
+        hi = self.hi
+        holes = self.holes
+        log = self.log
+        for v in values:
+            if v in holes:
+                continue
+            holes.add(v)
+            log.append(v)
+            self.size -= 1
+        if self.size == 0:
+            hi = lo - 1
+        else:
+            # the bounds skip the holes
+            while lo in holes:
+                lo += 1
+            while hi in holes:
+                hi -= 1
+        return self.moved(lo, hi)
+
+    # Remove the values outside of [lo, hi]
+    # return: feasible or not, nothing is removed when it's not
+    def clamp(self, lo: int, hi: int) -> bool:
+        lo = max(lo, self.lo)
+        hi = min(hi, self.hi)
+        holes = self.holes
+        if holes:
+            while lo <= hi and lo in holes:
+                lo += 1
+            while hi >= lo and hi in holes:
+                hi -= 1
+        if lo > hi:
+            return False
+        if lo == self.lo and hi == self.hi:
+            return True
+
+        self.save()
+        removed = (lo - self.lo) + (self.hi - hi)
+        if holes:
+            old_lo = self.lo
+            old_hi = self.hi
+            removed -= sum(1 for h in holes if old_lo <= h < lo or hi < h <= old_hi)
+        self.size -= removed
+        self.moved(lo, hi)
+        return True
+
+    # Assign `value` without recording it, undone by `temp_restore()`
+    # return: the state to restore
+    def temp_assign(self, value):
+        if self.size > 1:
+            self.events |= EVT_DOMAIN | EVT_BOUND | EVT_FIX
+        prev = (self.lo, self.hi, self.size)
+        self.lo = self.hi = value
+        self.size = 1
+        return prev
+
+    def temp_restore(self, prev):
+        self.lo, self.hi, self.size = prev
+
+    # Set the new bounds and fire the events of the change
+    # return: the events fired
+    def moved(self, lo: int, hi: int) -> int:
+        events = EVT_DOMAIN
+        if lo != self.lo or hi != self.hi:
+            events |= EVT_BOUND
+        self.lo = lo
+        self.hi = hi
+        if self.size == 1:
+            events |= EVT_FIX
+
+        self.events |= events
+        return events
+
+    # Remove all values except `value`
+    # return: the events fired
+    def assign(self, value) -> int:
+        if self.size == 1 and self.lo == value:
+            return 0
+        self.save()
+        self.size = 1
+        return self.moved(value, value)
@@ -0,0 +1,12 @@
+# Domain change events.
+#
+# A change fires all the weaker events too:
+#  a variable becomes fixed -> its bounds changed -> its domain changed
+#
+# Constraints subscribe to the weakest event they need, e.g. `NotEqual`
+#  only prunes after a variable is fixed, so it subscribes to EVT_FIX and
+#  isn't woken when some value in the middle of a domain is removed.
+
+EVT_DOMAIN = 1  # any value removed
+EVT_BOUND = 2  # min or max changed
+EVT_FIX = 4  # one value left
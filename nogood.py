@@ -0,0 +1,88 @@
+from collections import OrderedDict
+
+# A bounded store of nogoods for `BTSolver` with backjumping.
+#
+# A nogood is a set of decisions (vid, value) that can't all hold in a
+#  solution. They are recorded at dead ends from the conflict set, and
+#  checked before each decision: if all the other decisions of a nogood
+#  hold, the value is skipped without propagating it.
+#
+# The store keeps at most `capacity` nogoods, the least recently used one
+#  is evicted first. Nogoods longer than `max_length` are not recorded,
+#  they rarely match again.
+
+
+class NogoodStore:
+    def __init__(self, capacity: int = 1000, max_length: int = 8):
+        self.capacity = capacity
+        self.max_length = max_length
+        self.nogoods = OrderedDict[int, tuple[tuple[int, int], ...]]()  # LRU order
+        self.watch = dict[tuple[int, int], set[int]]()  # (vid, value) -> nogood ids
+        self.next_id = 0
+
+        # statistics
+        self.added = 0
+        self.evicted = 0
+        self.hits = 0
+
+    def __len__(self):
+        return len(self.nogoods)
+
+    # return: recorded or not
+    def add(self, literals: list[tuple[int, int]]) -> bool:
+        if len(literals) == 0 or len(literals) > self.max_length:
+            return False
+
+        if len(self.nogoods) >= self.capacity:
+            self.evict()
+
+        nid = self.next_id
+        self.next_id += 1
+        self.nogoods[nid] = tuple(literals)
+        for lit in literals:
+            self.watch.setdefault(lit, set()).add(nid)
+        self.added += 1
+        return True
+
+    def evict(self):
+        nid, literals = self.nogoods.popitem(last=False)
+        for lit in literals:
+            ids = self.watch[lit]
+            ids.discard(nid)
+            if len(ids) == 0:
+                del self.watch[lit]
+        self.evicted += 1
+
+    # Find a nogood that forbids `vid` = `value`, all its other decisions
+    #  must hold, i.e. the variable is fixed to the value.
+    # return: the other decisions of the nogood, or None
+    def blocking(
+        self, vid: int, value: int, variables: list
+    ) -> tuple[tuple[int, int], ...] | None:
+        ids = self.watch.get((vid, value))
+        if ids is None:
+            return None
+
+        for nid in ids:
+            others = []
+            for lit in self.nogoods[nid]:
+                v, val = lit
+                if v == vid:
+                    continue
+                d = variables[v].domain
+                if d.len() != 1 or d.value() != val:
+                    break
+                others.append(lit)
+            else:
+                self.nogoods.move_to_end(nid)
+                self.hits += 1
+                return tuple(others)
+        return None
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self.nogoods),
+            "added": self.added,
+            "evicted": self.evicted,
+            "hits": self.hits,
+        }
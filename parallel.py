@@ -0,0 +1,179 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from selector import VariableSelector
+from solver import BTSolver
+
+# Parallel search for `BTSolver`.
+#
+# The first decisions are split into "cubes" in the main process, a cube is
+#  a list of (vid, value) assumptions, i.e. an open sub-tree:
+#
+#                root
+#        A=1      A=2      A=3        <- split depth 1
+#      B=1 B=2  B=1 B=2    ...        <- split depth 2, if more cubes needed
+#
+# Each worker process gets a copy of the solver once, then solves cubes with
+#  `BTSolver.solve(assumptions=cube)`. The cubes are listed in the order the
+#  sequential search visits them.
+#
+# - deterministic=True: solutions are merged in cube order, the result is the
+#     same in every run. When only one solution is needed, the first solution
+#     of the lowest cube wins, cubes after it are stopped.
+# - deterministic=False: solutions are merged as cubes complete, when only one
+#     solution is needed, the first one found stops all workers.
+#
+#   solver = parse_question(...)
+#   solutions = solve_parallel(solver, workers=8)
+
+
+def solve_parallel(
+    solver: BTSolver,
+    workers: int | None = None,
+    cubes_per_worker: int = 4,
+    deterministic: bool = True,
+) -> list[dict[str, int]]:
+    workers = workers or os.cpu_count() or 1
+
+    cubes = split(solver, workers * cubes_per_worker)
+    if len(cubes) == 0:  # infeasible
+        return []
+
+    # index of the lowest cube that found a solution,
+    #  workers on a higher cube stop
+    best = multiprocessing.Value("q", len(cubes))
+
+    results = list[list[dict[str, int]]]()
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(cubes)),
+        initializer=init_worker,
+        initargs=(solver, best, deterministic),
+    ) as pool:
+        futures = [pool.submit(solve_cube, i, cube) for i, cube in enumerate(cubes)]
+        if deterministic:
+            results = [f.result() for f in futures]
+        else:
+            results = [f.result() for f in as_completed(futures)]
+
+    solutions = list[dict[str, int]]()
+    for sols in results:
+        solutions.extend(sols)
+        if len(solutions) > 0 and not solver.find_all:
+            solutions = solutions[:1]
+            break
+
+    solver.solutions.extend(solutions)
+    return solutions
+
+
+# Expand the first decisions breadth first, until there are at least
+#  `min_cubes` cubes or the whole tree is expanded. The variables are picked
+#  by `solver.next_variable_picker`, like the sequential search does.
+# return: the cubes in search order, empty if the problem is infeasible
+def split(solver: BTSolver, min_cubes: int) -> list[list[tuple[int, int]]]:
+    # a `VariableSelector` isn't told about the changes of the split,
+    #  `expand()` rebuilds its heap instead
+    selector = solver.selector
+    solver.selector = None
+    picker = solver.next_variable_picker
+    if isinstance(picker, VariableSelector):
+        picker.attach(solver)
+
+    solver.trail.push()
+    try:
+        if not solver.pre_check(set()):
+            return []
+
+        cubes = [[]]
+        while len(cubes) < min_cubes:
+            next_cubes = []
+            expanded = False
+            for cube in cubes:
+                children = expand(solver, cube)
+                if children is None:  # all variables are fixed, keep it
+                    next_cubes.append(cube)
+                else:
+                    next_cubes.extend(children)
+                    expanded = True
+            cubes = next_cubes
+            if not expanded:
+                break
+        return cubes
+    finally:
+        solver.trail.pop_to(0)
+        solver.selector = selector
+
+
+# return: the feasible children of `cube`, or None if it has no free variable
+def expand(
+    solver: BTSolver, cube: list[tuple[int, int]]
+) -> list[list[tuple[int, int]]] | None:
+    solver.trail.push()
+    try:
+        if not solver.assume(cube, set()):
+            return []
+
+        free = set(v.vid for v in solver.variables if v.domain.len() > 1)
+        if len(free) == 0:
+            return None
+
+        picker = solver.next_variable_picker
+        if isinstance(picker, VariableSelector):
+            picker.rebuild(free)
+        var = picker(free, solver.variables)
+        values = solver.values_orderer(var.domain.values())
+    finally:
+        solver.trail.pop()
+
+    children = []
+    for val in values:
+        child = cube + [(var.vid, val)]
+        solver.trail.push()
+        if solver.assume(child, set()):
+            children.append(child)
+        solver.trail.pop()
+    return children
+
+
+# ---------------- worker process ----------------
+
+worker_solver = None
+worker_best = None
+worker_deterministic = True
+
+
+def init_worker(solver: BTSolver, best, deterministic: bool):
+    global worker_solver, worker_best, worker_deterministic
+    worker_solver = solver
+    worker_best = best
+    worker_deterministic = deterministic
+
+
+# Set when a lower cube already found a solution
+class CubeInterrupt:
+    def __init__(self, best, index: int):
+        self.best = best
+        self.index = index
+
+    def is_set(self) -> bool:
+        return self.best.value < self.index
+
+
+def solve_cube(index: int, cube: list[tuple[int, int]]) -> list[dict[str, int]]:
+    solver = worker_solver
+    solver.solutions = []
+    if not solver.find_all:
+        solver.interrupt = CubeInterrupt(worker_best, index)
+
+    solver.solve(assumptions=cube)
+
+    if len(solver.solutions) > 0 and not solver.find_all:
+        # deterministic: stop the cubes after this one
+        # otherwise: stop all the others
+        stop_after = index if worker_deterministic else -1
+        with worker_best.get_lock():
+            if stop_after < worker_best.value:
+                worker_best.value = stop_after
+
+    return solver.solutions
@@ -0,0 +1,192 @@
+from time import perf_counter
+
+# Propagation profiler for `BTSolver`.
+#
+# `attach()` puts a `ProfiledConstraint` in front of every constraint of the
+#  solver and wraps `fix_point`, `detach()` puts the originals back. Nothing
+#  in the solver checks for it, so a solver without a profiler runs exactly
+#  as before.
+#
+# Recorded per constraint, and summed per constraint class:
+#  - calls, time spent in `prune()`
+#  - values removed from the domains of its scope
+#  - failures
+# and for the whole search, the number of `fix_point` runs and iterations
+#  (constraints pruned by one run).
+#
+# Sinks: the counters are kept in memory, see `report()`. Callbacks get each
+#  event as it happens:
+#   on_prune(constraint, seconds, removed, feasible)
+#   on_fix_point(iterations, feasible)
+#
+#   with Profiler().attach(solver) as profiler:
+#       solver.solve()
+#   profiler.print_report()
+
+
+class Profiler:
+    def __init__(self, on_prune=None, on_fix_point=None):
+        self.on_prune = on_prune
+        self.on_fix_point = on_fix_point
+        self.solver = None
+        self.originals = []  # the profiled constraints
+
+        # cid -> counters
+        self.calls = list[int]()
+        self.time = list[float]()
+        self.removed = list[int]()
+        self.failures = list[int]()
+
+        self.total_calls = 0
+        self.fix_points = 0
+        self.iterations = 0
+        self.max_iterations = 0
+
+    def attach(self, solver):
+        self.detach()
+        n = len(solver.constraints)
+        if len(self.calls) != n:
+            self.calls = [0] * n
+            self.time = [0.0] * n
+            self.removed = [0] * n
+            self.failures = [0] * n
+
+        self.solver = solver
+        self.originals = solver.constraints
+        solver.constraints = [ProfiledConstraint(c, self) for c in self.originals]
+
+        fix_point = solver.fix_point
+
+        def profiled_fix_point(forward_checkers=()):
+            before = self.total_calls
+            feasible = fix_point(forward_checkers)
+            iterations = self.total_calls - before
+            self.fix_points += 1
+            self.iterations += iterations
+            if iterations > self.max_iterations:
+                self.max_iterations = iterations
+            if self.on_fix_point is not None:
+                self.on_fix_point(iterations, feasible)
+            return feasible
+
+        solver.fix_point = profiled_fix_point
+        return self
+
+    def detach(self):
+        solver = self.solver
+        if solver is None:
+            return
+        solver.constraints = self.originals
+        del solver.fix_point  # back to the method
+        self.solver = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.detach()
+
+    def reset(self):
+        n = len(self.calls)
+        self.calls = [0] * n
+        self.time = [0.0] * n
+        self.removed = [0] * n
+        self.failures = [0] * n
+        self.total_calls = 0
+        self.fix_points = 0
+        self.iterations = 0
+        self.max_iterations = 0
+
+    # The in-memory report, the constraints are sorted by time spent
+    def report(self) -> dict:
+        constraints = []
+        classes = dict[str, dict]()
+        for cid, c in enumerate(self.originals):
+            cls = type(c).__name__
+            row = {
+                "calls": self.calls[cid],
+                "time": self.time[cid],
+                "removed": self.removed[cid],
+                "failures": self.failures[cid],
+            }
+            constraints.append({"cid": cid, "class": cls, "name": repr(c), **row})
+
+            total = classes.setdefault(
+                cls, {"count": 0, "calls": 0, "time": 0.0, "removed": 0, "failures": 0}
+            )
+            total["count"] += 1
+            for k, v in row.items():
+                total[k] += v
+
+        constraints.sort(key=lambda r: r["time"], reverse=True)
+        return {
+            "fix_points": self.fix_points,
+            "iterations": self.iterations,
+            "max_iterations": self.max_iterations,
+            "classes": classes,
+            "constraints": constraints,
+        }
+
+    def print_report(self, top: int = 10):
+        r = self.report()
+        print(
+            f"fix points: {r['fix_points']}, iterations: {r['iterations']}, "
+            f"max iterations: {r['max_iterations']}"
+        )
+        header = f"{'calls':>8} {'time':>9} {'removed':>8} {'failures':>8}"
+        print(f"{header}  class")
+        for cls, t in sorted(r["classes"].items(), key=lambda x: -x[1]["time"]):
+            print(
+                f"{t['calls']:8} {t['time']:9.4f} {t['removed']:8} "
+                f"{t['failures']:8}  {cls} x{t['count']}"
+            )
+        print(f"{header}  constraint")
+        for row in r["constraints"][:top]:
+            print(
+                f"{row['calls']:8} {row['time']:9.4f} {row['removed']:8} "
+                f"{row['failures']:8}  {row['cid']}: {row['name'][:60]}"
+            )
+
+
+# Stands for a constraint in `solver.constraints` while profiling
+class ProfiledConstraint:
+    def __init__(self, constraint, profiler: Profiler):
+        self.constraint = constraint
+        self.profiler = profiler
+        self.scope = list(constraint.affected_variables())
+
+    # everything else is the constraint's
+    def __getattr__(self, name):
+        return getattr(self.constraint, name)
+
+    def __repr__(self):
+        return repr(self.constraint)
+
+    def prune(self, variables):
+        c = self.constraint
+        p = self.profiler
+        cid = c.cid
+
+        size = 0
+        for vid in self.scope:
+            size += variables[vid].domain.len()
+
+        st = perf_counter()
+        feasible, changed = c.prune(variables)
+        cost = perf_counter() - st
+
+        removed = 0
+        if feasible:
+            for vid in self.scope:
+                removed += variables[vid].domain.len()
+            removed = size - removed
+        else:
+            p.failures[cid] += 1
+
+        p.calls[cid] += 1
+        p.total_calls += 1
+        p.time[cid] += cost
+        p.removed[cid] += removed
+        if p.on_prune is not None:
+            p.on_prune(c, cost, removed, feasible)
+        return feasible, changed
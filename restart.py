@@ -0,0 +1,33 @@
+# Fail limit schedules for `BTSolver.solve_restarts`.
+#
+# Run i of the search is stopped after `limit(i)` fails, then the search
+#  restarts from the root with a different tie-breaking. The limits grow,
+#  so the search is still complete.
+
+
+# 1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8, ...
+# https://en.wikipedia.org/wiki/Luby_sequence  (i starts from 1)
+def luby(i: int) -> int:
+    while True:
+        k = i.bit_length()
+        if i == (1 << k) - 1:
+            return 1 << (k - 1)
+        i -= (1 << (k - 1)) - 1
+
+
+class LubySchedule:
+    def __init__(self, scale: int = 100):
+        self.scale = scale
+
+    def limit(self, i: int) -> int:
+        return self.scale * luby(i + 1)
+
+
+# base, base*factor, base*factor^2, ...
+class GeometricSchedule:
+    def __init__(self, base: int = 100, factor: float = 1.5):
+        self.base = base
+        self.factor = factor
+
+    def limit(self, i: int) -> int:
+        return int(self.base * self.factor**i)
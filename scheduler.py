@@ -0,0 +1,85 @@
+from collections import deque
+
+# Propagation queue used by `BTSolver.fix_point`.
+#
+# Constraints are grouped by the cost they declare, cheap ones are always
+#  run first, so an expensive constraint is only woken after the cheap ones
+#  settled down and it sees all their changes at once:
+#
+#   binary (LessThan, Equal, NotEqual) < linear (SumUp) < global (AllDifferent)
+#
+# A constraint is queued at most once at a time.
+
+PRIORITY_BINARY = 0
+PRIORITY_LINEAR = 1
+PRIORITY_GLOBAL = 2
+
+
+class Scheduler:
+    def __init__(self):
+        self.priority = list[int]()  # cid -> priority
+        self.queued = list[bool]()  # cid -> already in a queue
+        self.queues = [deque[int]() for _ in range(PRIORITY_GLOBAL + 1)]
+        self.size = 0
+
+        # statistics
+        self.pushes = 0
+        self.duplicates = 0  # pushes skipped, already queued
+        self.pops = [0] * len(self.queues)  # per priority
+        self.max_size = 0
+
+    def __len__(self):
+        return self.size
+
+    # Called for every constraint added to the solver, in `cid` order
+    def register(self, priority: int):
+        self.priority.append(priority)
+        self.queued.append(False)
+
+    def push(self, cid: int):
+        if self.queued[cid]:
+            self.duplicates += 1
+            return
+        self.queued[cid] = True
+        self.queues[self.priority[cid]].append(cid)
+        self.pushes += 1
+        self.size += 1
+        if self.size > self.max_size:
+            self.max_size = self.size
+
+    # return: the cid of the cheapest queued constraint, or -1 if empty
+    def pop(self) -> int:
+        for p, q in enumerate(self.queues):
+            if len(q) > 0:
+                cid = q.popleft()
+                self.queued[cid] = False
+                self.size -= 1
+                self.pops[p] += 1
+                return cid
+        return -1
+
+    # Drop everything, after a failure
+    def clear(self):
+        for q in self.queues:
+            for cid in q:
+                self.queued[cid] = False
+            q.clear()
+        self.size = 0
+
+    def stats(self) -> dict:
+        return {
+            "pushes": self.pushes,
+            "duplicates": self.duplicates,
+            "pops": {
+                "binary": self.pops[PRIORITY_BINARY],
+                "linear": self.pops[PRIORITY_LINEAR],
+                "global": self.pops[PRIORITY_GLOBAL],
+            },
+            "max_size": self.max_size,
+        }
+
+    def reset_stats(self):
+        self.pushes = 0
+        self.duplicates = 0
+        self.pops = [0] * len(self.queues)
+        self.max_size = 0
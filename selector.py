@@ -0,0 +1,202 @@
+from abc import ABC, abstractmethod
+from heapq import heapify, heappop, heappush
+from math import exp, log
+
+# Variable selection heuristics for `BTSolver`.
+#
+# Sorting all unassigned variables at every node costs O(n log n).
+#  Instead, a selector keeps a heap of the variables, keyed by the heuristic,
+#  and the solver tells it what changed:
+#
+#   - update(vid):        the domain of `vid` changed (pruned or restored)
+#   - unassign(vid):      `vid` is unassigned again after backtracking
+#   - failed(cid):        constraint `cid` failed in `fix_point`
+#   - decided(vid, val) / propagated(vid, val, feasible):
+#                         around the propagation of a decision
+#
+# Each change pushes a new entry with a new version of the variable, older
+#  entries and entries of assigned variables are dropped lazily when they
+#  reach the top, so `select()` is O(log n).
+#
+# A selector is called like the plain function pickers:
+#
+#   var = selector(unassigned, variables)
+
+
+class VariableSelector(ABC):
+    # it learns from the search (weights, impacts), see `BTSolver.solve_restarts()`
+    learns = False
+
+    def __init__(self):
+        self.variables = []
+        self.heap = []
+        self.version = list[int]()
+        self.tiebreak = list[float]()  # vid -> tie-break, lower first
+
+    def __call__(self, unassigned: set[int], variables: list):
+        return self.select(unassigned, variables)
+
+    # Called when a search starts, `solver.variables` are at their initial state
+    def attach(self, solver):
+        self.variables = solver.variables
+        n = len(self.variables)
+        self.version = [0] * n
+        if len(self.tiebreak) != n:
+            self.tiebreak = [float(vid) for vid in range(n)]
+        self.heap = [(self.key(vid), 0, vid) for vid in range(n)]
+        heapify(self.heap)
+
+    # Random tie-breaking from now on, e.g. for restarts
+    def randomize(self, rng, num_variables: int):
+        self.tiebreak = [rng.random() for _ in range(num_variables)]
+
+    # The heuristic, the variable with the lowest key is selected
+    @abstractmethod
+    def key(self, vid: int) -> tuple:
+        pass
+
+    def update(self, vid: int):
+        self.version[vid] += 1
+        heappush(self.heap, (self.key(vid), self.version[vid], vid))
+
+    def unassign(self, vid: int):
+        self.update(vid)
+
+    # `Trail.on_restore`
+    def restored(self, domain):
+        self.update(domain.vid)
+
+    def failed(self, cid: int):
+        pass
+
+    def decided(self, vid: int, val: int):
+        pass
+
+    def propagated(self, vid: int, val: int, feasible: bool):
+        pass
+
+    def select(self, unassigned: set[int], variables: list):
+        heap = self.heap
+        version = self.version
+
+        # too many dropped entries, rebuild from the unassigned variables
+        if len(heap) > 4 * len(variables) + 64:
+            self.rebuild(unassigned)
+            heap = self.heap
+
+        while len(heap) > 0:
+            _, ver, vid = heap[0]
+            if ver == version[vid] and vid in unassigned:
+                return variables[vid]
+            heappop(heap)
+
+        # shouldn't happen, every unassigned variable has a valid entry
+        self.rebuild(unassigned)
+        return variables[self.heap[0][2]]
+
+    def rebuild(self, unassigned: set[int]):
+        version = self.version
+        self.heap = [(self.key(vid), version[vid], vid) for vid in unassigned]
+        heapify(self.heap)
+
+
+# Smallest domain first, ties broken by the most constraints.
+class MRVSelector(VariableSelector):
+    def key(self, vid: int) -> tuple:
+        v = self.variables[vid]
+        return (v.domain.len(), -len(v.affected_constraints), self.tiebreak[vid])
+
+
+# dom/wdeg: smallest domain size / weighted degree first.
+#  Every constraint starts with weight 1, the weight is increased each time
+#  the constraint fails, so variables in hard constraints are tried first.
+#  The weights are kept between searches.
+class DomWDegSelector(VariableSelector):
+    learns = True
+
+    def __init__(self):
+        super().__init__()
+        self.weights = list[int]()  # cid -> weight
+        self.wdeg = list[int]()  # vid -> sum of weights of its constraints
+        self.scopes = list[list[int]]()  # cid -> vids
+
+    def attach(self, solver):
+        constraints = solver.constraints
+        if len(self.weights) != len(constraints):
+            self.weights = [1] * len(constraints)
+        self.scopes = [list(c.affected_variables()) for c in constraints]
+        self.wdeg = [
+            sum(self.weights[cid] for cid in v.affected_constraints)
+            for v in solver.variables
+        ]
+        super().attach(solver)
+
+    def key(self, vid: int) -> tuple:
+        size = self.variables[vid].domain.len()
+        return (size / max(self.wdeg[vid], 1), self.tiebreak[vid])
+
+    def failed(self, cid: int):
+        self.weights[cid] += 1
+        for vid in self.scopes[cid]:
+            self.wdeg[vid] += 1
+            self.update(vid)
+
+
+# Impact based search:
+#  the impact of a decision x=a is how much of the search space it cut,
+#    1 - space_after_propagation / space_before    (1 if it fails)
+#  the space is the product of the domain sizes, tracked as a sum of logs.
+#  The variable whose values have the highest average impact is tried first,
+#  ties broken by the smallest domain. The impacts are kept between searches.
+#
+# https://link.springer.com/chapter/10.1007/978-3-540-30201-8_41
+class ImpactSelector(VariableSelector):
+    learns = True
+
+    def __init__(self, default_impact: float = 0.5):
+        super().__init__()
+        self.default_impact = default_impact
+        self.impacts = dict[tuple[int, int], float]()  # (vid, val) -> impact
+        self.counts = dict[tuple[int, int], int]()
+        self.sizes = list[int]()
+        self.log_space = 0.0
+        self.space_before = 0.0
+
+    def attach(self, solver):
+        self.sizes = [v.domain.len() for v in solver.variables]
+        self.log_space = sum(log(s) for s in self.sizes if s > 0)
+        super().attach(solver)
+
+    def key(self, vid: int) -> tuple:
+        d = self.variables[vid].domain
+        impacts = self.impacts
+        default = self.default_impact
+        total = 0.0
+        for val in d.values():
+            total += impacts.get((vid, val), default)
+        size = d.len()
+        avg = total / size if size > 0 else 0.0
+        return (-avg, size, self.tiebreak[vid])
+
+    def update(self, vid: int):
+        size = self.variables[vid].domain.len()
+        old = self.sizes[vid]
+        if size != old and size > 0 and old > 0:
+            self.log_space += log(size) - log(old)
+        self.sizes[vid] = size
+        super().update(vid)
+
+    def decided(self, vid: int, val: int):
+        self.space_before = self.log_space
+
+    def propagated(self, vid: int, val: int, feasible: bool):
+        impact = 1.0
+        if feasible:
+            impact = 1.0 - exp(self.log_space - self.space_before)
+
+        # running average
+        k = (vid, val)
+        n = self.counts.get(k, 0)
+        old = self.impacts.get(k, 0.0)
+        self.impacts[k] = (old * n + impact) / (n + 1)
+        self.counts[k] = n + 1
@@ -0,0 +1,276 @@
+import mmap
+import struct
+import sys
+from array import array
+
+from constraint import AllDifferent, Equal, LessThan, NotEqual, SumUp, Table
+from domain import Domain
+from domain_bitset import BitsetDomain
+from domain_interval import IntervalDomain
+from solver import BTSolver
+from variable import Variable
+
+# A compact binary format of `BTSolver` models.
+#
+# Pickling a solver copies the whole object graph. This format stores the
+#  model as a few flat arrays, all little-endian:
+#
+#   header     "<4sHHII": magic, version, 0, variable count, constraint count
+#   names      u32 byte length, the names in utf-8 joined by "\n"
+#   types      u8 per variable: the domain type, see `DOMAIN_TYPES`
+#   domains    u32 starts[variables + 1], i64 values[starts[-1]]
+#              (`IntervalDomain`: lo, hi, then the holes)
+#   kinds      u8 per constraint, see `KIND_*`
+#   flags      u8 per constraint: LessThan include_equal,
+#                                 AllDifferent 1 if "bounds"
+#   scopes     u32 starts[constraints + 1], u32 lefts[constraints]
+#              (SumUp: the number of left terms), i32 vids[starts[-1]],
+#              i64 coeffs[starts[-1]]
+#   tables     u32 starts[tables + 1], i64 values[starts[-1]]: the tuples of
+#              each `Table` constraint, row by row (version 2)
+#
+# `loads()` reads any buffer, e.g. an `mmap`, and adds the constraints in
+#  bulk, see `Solver.add_constraints()`.
+#
+#   save(solver, "model.bin")     # written through a memory-mapped file
+#   solver = load("model.bin")
+
+MAGIC = b"CSPM"
+VERSION = 2  # 1: no tables
+HEADER = struct.Struct("<4sHHII")
+
+DOMAIN_TYPES = [Domain, BitsetDomain, IntervalDomain]
+KIND_LESS = 0
+KIND_EQUAL = 1
+KIND_NOT_EQUAL = 2
+KIND_ALL_DIFFERENT = 3
+KIND_SUM = 4
+KIND_TABLE = 5
+
+
+def dumps(solver: BTSolver) -> bytes:
+    variables = solver.variables
+    constraints = solver.constraints
+
+    names = "\n".join(v.name for v in variables).encode()
+    types = bytes(domain_type_code(v.domain) for v in variables)
+    dom_starts = array("I", [0])
+    dom_values = array("q")
+    for v in variables:
+        dom_values.extend(domain_record(v.domain))
+        dom_starts.append(len(dom_values))
+
+    kinds = bytearray()
+    flags = bytearray()
+    starts = array("I", [0])
+    lefts = array("I")
+    vids = array("i")
+    coeffs = array("q")
+    table_starts = array("I", [0])
+    table_values = array("q")
+    for c in constraints:
+        kind, flag, left, c_vids, c_coeffs = record(c)
+        kinds.append(kind)
+        flags.append(flag)
+        lefts.append(left)
+        vids.extend(c_vids)
+        coeffs.extend(c_coeffs)
+        starts.append(len(vids))
+        if isinstance(c, Table):
+            for t in c.tuples:
+                table_values.extend(t)
+            table_starts.append(len(table_values))
+
+    parts = [
+        HEADER.pack(MAGIC, VERSION, 0, len(variables), len(constraints)),
+        struct.pack("<I", len(names)),
+        names,
+        types,
+    ]
+    for a in [dom_starts, dom_values]:
+        parts.append(to_bytes(a))
+    parts.append(bytes(kinds))
+    parts.append(bytes(flags))
+    for a in [starts, lefts, vids, coeffs, table_starts, table_values]:
+        parts.append(to_bytes(a))
+    return b"".join(parts)
+
+
+def loads(buffer) -> BTSolver:
+    mv = memoryview(buffer)
+    magic, version, _, n_vars, n_cons = HEADER.unpack_from(mv, 0)
+    if magic != MAGIC:
+        raise ValueError("not a model file")
+    if version not in (1, VERSION):
+        raise ValueError(f"unsupported model version: {version}")
+    reader = Reader(mv, HEADER.size)
+
+    (names_len,) = struct.unpack_from("<I", mv, reader.offset)
+    reader.offset += 4
+    names = bytes(reader.take(names_len)).decode().split("\n") if n_vars else []
+    types = bytes(reader.take(n_vars))
+    dom_starts = reader.array("I", n_vars + 1)
+    dom_values = reader.array("q", dom_starts[-1]).tolist()
+
+    kinds = bytes(reader.take(n_cons))
+    flags = bytes(reader.take(n_cons))
+    starts = reader.array("I", n_cons + 1)
+    lefts = reader.array("I", n_cons)
+    vids = reader.array("i", starts[-1]).tolist()
+    coeffs = reader.array("q", starts[-1]).tolist()
+    tables = []
+    if version >= 2:
+        n_tables = sum(1 for k in kinds if k == KIND_TABLE)
+        table_starts = reader.array("I", n_tables + 1)
+        table_values = reader.array("q", table_starts[-1]).tolist()
+        tables = [
+            table_values[s:e] for s, e in zip(table_starts, table_starts[1:])
+        ]
+    tables = iter(tables)
+
+    solver = BTSolver()
+    for i in range(n_vars):
+        values = dom_values[dom_starts[i] : dom_starts[i + 1]]
+        solver.add_variable(domain_variable(names[i], values, DOMAIN_TYPES[types[i]]))
+
+    variables = solver.variables
+    solver.add_constraints(
+        build(
+            kinds[cid], flags[cid], lefts[cid], vids[s:e], coeffs[s:e], variables, tables
+        )
+        for cid, s, e in zip(range(n_cons), starts, starts[1:])
+    )
+    return solver
+
+
+# Write through a memory-mapped file
+def save(solver: BTSolver, path: str):
+    data = dumps(solver)
+    with open(path, "w+b") as f:
+        f.truncate(len(data))
+        if len(data) == 0:
+            return
+        with mmap.mmap(f.fileno(), len(data)) as mm:
+            mm[:] = data
+
+
+def load(path: str) -> BTSolver:
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return loads(mm)
+
+
+# ---------------- records ----------------
+
+
+def domain_type_code(domain) -> int:
+    for code, t in enumerate(DOMAIN_TYPES):
+        if type(domain) is t:
+            return code
+    raise TypeError(f"can't serialize domain {type(domain).__name__}")
+
+
+# return: the values of a domain, for an `IntervalDomain` [lo, hi, holes..]
+def domain_record(d) -> list[int]:
+    if isinstance(d, IntervalDomain):
+        lo = d.min()
+        hi = d.max()
+        return [lo, hi] + sorted(h for h in d.holes if lo < h < hi)
+    return list(d.values())
+
+
+def domain_variable(name: str, values: list[int], domain_type: type) -> Variable:
+    if domain_type is not IntervalDomain:
+        return Variable(name, values, domain_type)
+    if len(values) < 2:
+        raise ValueError("truncated model file")
+    v = Variable(name, range(values[0], values[1] + 1), IntervalDomain)
+    if len(values) > 2:
+        v.domain.remove_values(values[2:])
+        v.domain.events = 0
+    return v
+
+
+# return: (kind, flag, left count, vids, coeffs) of a constraint
+def record(c) -> tuple[int, int, int, list[int], list[int]]:
+    if isinstance(c, LessThan):
+        return KIND_LESS, int(c.include_equal), 0, [c.vid1, c.vid2], [0, 0]
+    if isinstance(c, Equal):
+        return KIND_EQUAL, 0, 0, [c.vid1, c.vid2], [0, 0]
+    if isinstance(c, NotEqual):
+        return KIND_NOT_EQUAL, 0, 0, [c.vid1, c.vid2], [0, 0]
+    if isinstance(c, AllDifferent):
+        flag = int(c.consistency == "bounds")
+        return KIND_ALL_DIFFERENT, flag, 0, list(c.vids), [0] * len(c.vids)
+    if isinstance(c, SumUp):
+        return (
+            KIND_SUM,
+            0,
+            len(c.lvids),
+            c.lvids + c.rvids,
+            c.lcoeffs + c.rcoeffs,
+        )
+    if isinstance(c, Table):
+        return KIND_TABLE, 0, 0, list(c.vids), [0] * len(c.vids)
+    raise TypeError(f"can't serialize {type(c).__name__}: {c}")
+
+
+# tables: an iterator of the flattened tuples of the `Table` constraints
+def build(
+    kind: int,
+    flag: int,
+    left: int,
+    vids: list[int],
+    coeffs: list[int],
+    variables,
+    tables,
+):
+    vs = [variables[vid] for vid in vids]
+    if kind == KIND_LESS:
+        return LessThan(vs[0], vs[1], include_equal=bool(flag))
+    if kind == KIND_EQUAL:
+        return Equal(vs[0], vs[1])
+    if kind == KIND_NOT_EQUAL:
+        return NotEqual(vs[0], vs[1])
+    if kind == KIND_ALL_DIFFERENT:
+        return AllDifferent(vs, "bounds" if flag else "domain")
+    if kind == KIND_SUM:
+        return SumUp(vs[:left], coeffs[:left], vs[left:], coeffs[left:])
+    if kind == KIND_TABLE:
+        values = next(tables, None)
+        if values is None:
+            raise ValueError("truncated model file")
+        k = len(vs)
+        rows = [values[i : i + k] for i in range(0, len(values), k)] if k else []
+        return Table(vs, rows)
+    raise ValueError(f"unknown constraint kind: {kind}")
+
+
+# ---------------- arrays ----------------
+
+
+def to_bytes(a: array) -> bytes:
+    if sys.byteorder == "big":
+        a = array(a.typecode, a)
+        a.byteswap()
+    return a.tobytes()
+
+
+class Reader:
+    def __init__(self, mv: memoryview, offset: int):
+        self.mv = mv
+        self.offset = offset
+
+    def take(self, size: int) -> memoryview:
+        chunk = self.mv[self.offset : self.offset + size]
+        if len(chunk) != size:
+            raise ValueError("truncated model file")
+        self.offset += size
+        return chunk
+
+    def array(self, typecode: str, count: int) -> array:
+        a = array(typecode)
+        a.frombytes(self.take(count * a.itemsize))
+        if sys.byteorder == "big":
+            a.byteswap()
+        return a
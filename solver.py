@@ -1,41 +1,85 @@
 from variable import Variable
+from constraint import SumUp, clamp
+from trail import Trail
+from event import EVT_BOUND, EVT_FIX
+from scheduler import Scheduler
+from selector import VariableSelector, MRVSelector, DomWDegSelector
+from restart import LubySchedule
+from nogood import NogoodStore
 from abc import ABC, abstractmethod
-from functools import cmp_to_key
+from random import Random
+from time import perf_counter
 
 type VarId = int
 type Val = int
 
 
+# Smallest domain first, ties broken by the most constraints.
+# It scans all unassigned variables, `MRVSelector` does the same in O(log n).
 def Degree_MRV(
     unassigned: set[int],
     variables: list[Variable],
 ) -> Variable:
-    def fn(a: int, b: int) -> int:
-        va = variables[a]
-        vb = variables[b]
+    def key(vid: int) -> tuple[int, int, int]:
+        v = variables[vid]
+        return (v.domain.len(), -len(v.affected_constraints), vid)
 
-        if len(va.affected_constraints) < len(vb.affected_constraints):
-            return 1
-        if va.domain.len() < vb.domain.len():
-            return -1
-        return 0
-
-    sorted_ = sorted(unassigned, key=cmp_to_key(fn))
-    first_vid = sorted_[0]
-    return variables[first_vid]
+    return variables[min(unassigned, key=key)]
 
 
 def no_sorter(s):
     return list(s)
 
 
+# `BTSolver.status` after a search
+STATUS_FINISHED = "finished"  # explored, or stopped after the requested solutions
+STATUS_INTERRUPTED = "interrupted"  # by `BTSolver.interrupt`
+STATUS_NODE_LIMIT = "node_limit"
+STATUS_FAIL_LIMIT = "fail_limit"
+STATUS_TIME_LIMIT = "time_limit"
+
+
+# Raised inside the search when it's cut off, `status` tells why
+class SearchInterrupted(Exception):
+    def __init__(self, status: str = STATUS_INTERRUPTED):
+        super().__init__(status)
+        self.status = status
+
+
+# Raised inside the search when `BTSolver.restart_limit` is reached
+class SearchRestart(Exception):
+    pass
+
+
+class SearchStats:
+    def __init__(self):
+        self.nodes = 0  # decisions tried
+        self.fails = 0  # decisions that failed in `fix_point`
+        self.restarts = 0
+        self.backjumps = 0  # decision levels skipped by backjumping
+        self.start = perf_counter()
+
+    # seconds since the search started
+    def elapsed(self) -> float:
+        return perf_counter() - self.start
+
+    def __repr__(self):
+        return (
+            f"nodes: {self.nodes}, fails: {self.fails}, "
+            f"restarts: {self.restarts}, backjumps: {self.backjumps}"
+        )
+
+
 class Solver(ABC):
     def __init__(
         self,
     ):
         self.variables = []
         self.constraints = []
+        self.names = list[str]()  # vid -> name, shared by the constraints
         self.solutions = []
+        self.trail = Trail()
+        self.scheduler = Scheduler()
 
     def print(self):
         print("Solver:")
@@ -46,24 +90,68 @@ class Solver(ABC):
 
     def add_variable(self, variable):
         variable.vid = len(self.variables)  # Assign an ID to the variable
+        variable.domain.vid = variable.vid
+        variable.domain.trail = self.trail
         self.variables.append(variable)
+        self.names.append(variable.name)
 
     def add_variables(self, variables):
         for v in variables:
             self.add_variable(v)
 
     def add_constraint(self, constraint):
-        constraint.cid = len(self.constraints)
-        self.constraints.append(constraint)
+        self.add_constraints((constraint,))
+
+    # `variable` is in the scope of `constraint`, which has its `cid`
+    def subscribe(self, variable, constraint):
+        variable.affected_constraints.add(constraint.cid)
 
-        # Initialize affected constraints for each variable
-        for v in self.variables:
-            if v.vid in constraint.affected_variables():
-                v.affected_constraints.add(constraint.cid)
+        if constraint.events & EVT_FIX:
+            variable.on_fix.append(constraint.cid)
+        elif constraint.events & EVT_BOUND:
+            variable.on_bound.append(constraint.cid)
+        else:
+            variable.on_domain.append(constraint.cid)
 
+    # The incidence of the variables is built in one pass over the scopes.
     def add_constraints(self, constraints):
+        variables = self.variables
+        register = self.scheduler.register
+        subscribe = self.subscribe
         for c in constraints:
-            self.add_constraint(c)
+            c.cid = len(self.constraints)
+            c.names = self.names
+            self.constraints.append(c)
+            register(c.priority)
+
+            # Initialize affected constraints for each variable of its scope
+            for vid in c.affected_variables():
+                subscribe(variables[vid], c)
+
+    # Columnar input: `domains[i]` are the values of `names[i]`
+    # return: the new variables
+    def add_variable_columns(
+        self, names: list[str], domains: list[list[int]], domain_type: type | None = None
+    ) -> list[Variable]:
+        variables = [
+            Variable(name, values, domain_type)
+            for name, values in zip(names, domains, strict=True)
+        ]
+        self.add_variables(variables)
+        return variables
+
+    # Columnar input: one `cls` constraint per row of the vid `columns`, the
+    #  keyword arguments are passed to each, e.g. x0 != x1, x0 != x2, x1 != x2:
+    #   solver.add_constraint_columns(NotEqual, [0, 0, 1], [1, 2, 2])
+    # return: the new constraints
+    def add_constraint_columns(self, cls, *columns: list[int], **kwargs) -> list:
+        variables = self.variables
+        constraints = [
+            cls(*(variables[vid] for vid in row), **kwargs)
+            for row in zip(*columns, strict=True)
+        ]
+        self.add_constraints(constraints)
+        return constraints
 
     @abstractmethod
     def solve(self, all: bool = False):
@@ -73,81 +161,586 @@ class Solver(ABC):
 class BTSolver(Solver):
     def __init__(self):
         super().__init__()
-        self.next_variable_picker = Degree_MRV
+        # a function or a `VariableSelector`
+        self.next_variable_picker = MRVSelector()
         self.values_orderer = no_sorter
         self.find_all = False  # find all solutions or just one
-
+        self.selector = None  # the picker when it's a `VariableSelector`
+
+        # Budgets of a search, checked before every decision. When one is
+        #  reached the search stops, the model is restored and `status` tells
+        #  why, the solutions found so far are kept.
+        # interrupt: anything with `is_set()`, e.g. `threading.Event`
+        self.interrupt = None
+        self.node_limit = None  # `stats.nodes`
+        self.fail_limit = None  # `stats.fails`
+        self.time_limit = None  # seconds
+        self.limited = False  # any of the above is set, for the search
+
+        self.status = STATUS_FINISHED  # of the last search
+        self.interrupted = False  # the last search was cut off
+        self.stats = SearchStats()  # of the last search
+        self.restart_limit = None  # restart when `stats.fails` reaches it
+
+        # Conflict-directed backjumping, see `dfs_cbj`
+        self.backjumping = False
+        self.nogoods: NogoodStore | None = None  # used with backjumping
+
+        # set up by `search()` when backjumping
+        self.deps = None  # vid -> bit mask of the decision levels it depends on
+        self.dep_trail = list[tuple[int, int]]()  # (vid, previous mask)
+        self.decisions = list[tuple[int, int]]()  # (vid, value) of level 1, 2..
+        self.scopes = list[list[int]]()  # cid -> vids
+        self.conflict = 0  # decision levels of the last failure
+
+        # (vid, lo, hi): the objective of `optimize()` is kept in [lo, hi],
+        #  None for no limit, checked at every fix point
+        self.bound = None
+
+    # Run the queued constraints, cheapest first, until nothing changes.
+    # forward_checkers: constraints to queue besides the ones already queued
     # return: feasible or not
     def fix_point(
         self,
-        forward_checkers: set[int],
+        forward_checkers: set[int] = (),
     ) -> bool:
-        while len(forward_checkers) > 0:
-            cid = forward_checkers.pop()
+        queue = self.scheduler
+        for cid in forward_checkers:
+            queue.push(cid)
+
+        if self.bound is not None and not self.apply_bound():
+            queue.clear()
+            return False  # infeasible
+
+        while True:
+            cid = queue.pop()
+            if cid == -1:
+                return True  # feasible
+
             c = self.constraints[cid]
             feasible, changed_vars = c.prune(self.variables)
             if not feasible:
+                queue.clear()
+                if self.selector is not None:
+                    self.selector.failed(cid)
+                if self.deps is not None:
+                    self.conflict = self.scope_deps(cid)
                 return False  # infeasible
 
-            # add affected constraints to forward checkers
+            # the pruned values depend on the decisions the scope depends on
+            if self.deps is not None and len(changed_vars) > 0:
+                self.explain(cid, changed_vars)
+
+            # queue the constraints subscribed to the fired events,
+            #  an idempotent constraint isn't woken by its own changes
+            skip_cid = cid if c.idempotent else -1
             for vid in changed_vars:
-                v = self.variables[vid]
-                for cid in v.affected_constraints:
-                    if cid != c.cid:
-                        forward_checkers.add(cid)
+                self.wake(vid, skip_cid)
 
-        return True  # feasible
+    # Remove the values of the objective outside of `bound`
+    # return: feasible or not
+    def apply_bound(self) -> bool:
+        vid, lo, hi = self.bound
+        d = self.variables[vid].domain
+        feasible, pruned = clamp(
+            d, d.min() if lo is None else lo, d.max() if hi is None else hi
+        )
+        if not feasible:  # no better solution below this node
+            if self.deps is not None:
+                self.conflict = self.deps[vid]
+            return False
+        if pruned:
+            self.wake(vid)
+        return True
+
+    # return: the decision levels the domains in the scope of `cid` depend on
+    def scope_deps(self, cid: int) -> int:
+        deps = self.deps
+        mask = 0
+        for vid in self.scopes[cid]:
+            mask |= deps[vid]
+        return mask
+
+    def explain(self, cid: int, changed_vars):
+        deps = self.deps
+        mask = self.scope_deps(cid)
+        for vid in changed_vars:
+            old = deps[vid]
+            if old | mask != old:
+                self.dep_trail.append((vid, old))
+                deps[vid] = old | mask
+
+    # Queue the constraints subscribed to the pending events of variable `vid`,
+    #  except `skip_cid`, and clear the events.
+    def wake(self, vid: int, skip_cid: int = -1):
+        v = self.variables[vid]
+        events = v.domain.events
+        if events == 0:
+            return
+        v.domain.events = 0
+
+        if self.selector is not None:
+            self.selector.update(vid)
+
+        push = self.scheduler.push
+        if events & EVT_FIX:
+            for cid in v.on_fix:
+                if cid != skip_cid:
+                    push(cid)
+        if events & EVT_BOUND:
+            for cid in v.on_bound:
+                if cid != skip_cid:
+                    push(cid)
+        for cid in v.on_domain:
+            if cid != skip_cid:
+                push(cid)
+
+    # assumptions: (vid, value) pairs fixed before searching,
+    #  only the sub-tree below them is explored
+    def solve(self, assumptions: list[tuple[int, int]] = ()):
+        for solution in self.solve_iter(assumptions):
+            self.solutions.append(solution)
+            if not self.find_all:
+                break
+
+    # Yield each solution as soon as it's found, then continue the search.
+    # The search is suspended at the solution between yields, stopping the
+    #  iteration (or reaching `limit`) restores the model like `solve()`.
+    #
+    #   for solution in solver.solve_iter():
+    #       ...
+    def solve_iter(
+        self,
+        assumptions: list[tuple[int, int]] = (),
+        limit: int | None = None,
+    ):
+        if limit is not None and limit <= 0:
+            return
 
-    def solve(self):
+        search = self.search(assumptions)
+        try:
+            found = 0
+            for _ in search:
+                yield self.solution()
+                found += 1
+                if limit is not None and found >= limit:
+                    return
+        finally:
+            search.close()
+
+    # Count the solutions without building them.
+    # limit: stop counting there, e.g. `count(limit=2) == 1` checks uniqueness
+    def count(
+        self,
+        limit: int | None = None,
+        assumptions: list[tuple[int, int]] = (),
+    ) -> int:
+        if limit is not None and limit <= 0:
+            return 0
+
+        found = 0
+        search = self.search(assumptions)
+        try:
+            for _ in search:
+                found += 1
+                if limit is not None and found >= limit:
+                    break
+        finally:
+            search.close()
+        return found
+
+    # Restart the search each time the fail limit of `schedule` is reached,
+    #  with a different random tie-breaking. Learned information of the
+    #  selector (e.g. dom/wdeg weights) is kept across restarts. A picker
+    #  that doesn't learn, e.g. the default `MRVSelector`, is replaced by a
+    #  `DomWDegSelector` for the call.
+    #
+    # max_restarts: the last run has no fail limit
+    # return: the first solution, or None if infeasible or interrupted
+    def solve_restarts(
+        self,
+        schedule=None,
+        seed: int | None = None,
+        max_restarts: int | None = None,
+    ) -> dict[str, int] | None:
+        schedule = schedule or LubySchedule()
+        picker = self.next_variable_picker
+        if isinstance(picker, VariableSelector) and picker.learns:
+            selector = picker
+        else:
+            selector = DomWDegSelector()
+        tiebreak = selector.tiebreak
+        rng = Random(seed)
+        self.stats = SearchStats()
+        self.scheduler.reset_stats()
+
+        # the picker and its tie-breaking are put back at the end
+        self.next_variable_picker = selector
+        try:
+            run = 0
+            while True:
+                if max_restarts is None or run < max_restarts:
+                    limit = schedule.limit(run)
+                else:
+                    limit = None
+                selector.randomize(rng, len(self.variables))
+
+                search = self.search(reset_stats=False)
+                try:
+                    # the limit counts from the fails of the previous runs
+                    if limit is not None:
+                        self.restart_limit = self.stats.fails + limit
+                    for _ in search:
+                        solution = self.solution()
+                        self.solutions.append(solution)
+                        return solution
+                    return None  # the whole tree is explored, or cut off
+                except SearchRestart:
+                    run += 1
+                    self.stats.restarts += 1
+                finally:
+                    search.close()
+                    self.restart_limit = None
+        finally:
+            self.next_variable_picker = picker
+            selector.tiebreak = tiebreak
+
+    # A variable equal to sum(coeffs[i] * variables[i]), to `optimize()`.
+    # Its domain is every value between the bounds of the sum, an
+    #  `IntervalDomain` when it's big, see `Variable`.
+    def add_objective(
+        self,
+        variables: list[Variable],
+        coeffs: list[int],
+        name: str = "objective",
+        domain_type: type | None = None,
+    ) -> Variable:
+        lo = hi = 0
+        for v, co in zip(variables, coeffs, strict=True):
+            a = co * v.domain.min()
+            b = co * v.domain.max()
+            lo += min(a, b)
+            hi += max(a, b)
+
+        objective = Variable(name, range(lo, hi + 1), domain_type)
+        self.add_variable(objective)
+        self.add_constraint(SumUp(variables, coeffs, [objective], [1]))
+        return objective
+
+    # Branch and bound: find the solution with the smallest (or largest)
+    #  value of `objective`, e.g. from `add_objective()`.
+    #
+    # Each solution found tightens `bound`, the rest of the search only looks
+    #  for better ones: the objective loses its values that aren't better at
+    #  every fix point, and the constraints on it, e.g. the `SumUp` of
+    #  `add_objective()`, prune the rest of the model against it.
+    #
+    # on_improve(solution, value, gap): called at each better solution, gap
+    #  is how far the value is from the bound of the objective at the root
+    # return: the best solution, or None if infeasible. It's optimal if the
+    #  search wasn't cut off, see `status`.
+    #
+    #   cost = solver.add_objective([x, y, z], [3, 2, 5])
+    #   best = solver.optimize(cost)
+    def optimize(
+        self,
+        objective: Variable,
+        minimize: bool = True,
+        on_improve=None,
+    ) -> dict[str, int] | None:
+        vid = objective.vid
+        d = objective.domain
+
+        # the bound at the root, for the gap
+        self.trail.push()
+        feasible = self.fix_point({c.cid for c in self.constraints})
+        root = d.min() if minimize else d.max()
+        self.trail.pop()
+        if not feasible:
+            self.status = STATUS_FINISHED
+            self.interrupted = False
+            return None
+
+        # nogoods found under the bound only hold under it, they go to a
+        #  store that is dropped with the bound
+        nogoods = self.nogoods
+        if nogoods is not None:
+            self.nogoods = NogoodStore(nogoods.capacity, nogoods.max_length)
+
+        best = None
+        self.bound = (vid, None, None)
+        search = self.search()
+        try:
+            for _ in search:
+                best = self.solution()
+                value = d.value()
+                if minimize:
+                    self.bound = (vid, None, value - 1)
+                else:
+                    self.bound = (vid, value + 1, None)
+                if on_improve is not None:
+                    on_improve(best, value, abs(value - root))
+                if value == root:
+                    break  # can't be better
+        finally:
+            search.close()
+            self.bound = None
+            self.nogoods = nogoods
+
+        if best is not None:
+            self.solutions.append(best)
+        return best
+
+    # Set up a search and yield at every solution, the model is restored
+    #  when the generator ends or is closed.
+    def search(
+        self, assumptions: list[tuple[int, int]] = (), reset_stats: bool = True
+    ):
         unassigned = set(v.vid for v in self.variables)
 
-        if not self.pre_check(unassigned):
-            return
-
-        self.dfs(unassigned)
+        self.attach_selector()
+        self.status = STATUS_FINISHED
+        self.interrupted = False
+        self.limited = (
+            self.interrupt is not None
+            or self.node_limit is not None
+            or self.fail_limit is not None
+            or self.time_limit is not None
+        )
+        if reset_stats:
+            self.stats = SearchStats()
+            self.scheduler.reset_stats()
+
+        # everything below is undone when the search ends,
+        #  the model can be solved again
+        if self.backjumping:
+            self.deps = [0] * len(self.variables)
+            self.dep_trail = []
+            self.decisions = []
+            self.scopes = [list(c.affected_variables()) for c in self.constraints]
+
+        # nogoods found under the assumptions only hold under them, like the
+        #  bound of `optimize()`, they go to a store dropped after the search
+        nogoods = self.nogoods
+        if nogoods is not None and len(assumptions) > 0:
+            self.nogoods = NogoodStore(nogoods.capacity, nogoods.max_length)
+
+        self.trail.push()
+        try:
+            if not self.pre_check(unassigned):
+                return
+
+            if not self.assume(assumptions, unassigned):
+                return
+
+            if self.backjumping:
+                yield from self.dfs_cbj(unassigned)
+            else:
+                yield from self.dfs(unassigned)
+        except SearchInterrupted as e:
+            self.status = e.status
+            self.interrupted = True
+        finally:
+            self.trail.pop_to(0)
+            self.trail.on_restore = None
+            self.deps = None
+            self.nogoods = nogoods
+
+    # Raise `SearchInterrupted` if a budget is used up
+    def check_limits(self):
+        stats = self.stats
+        if self.interrupt is not None and self.interrupt.is_set():
+            raise SearchInterrupted(STATUS_INTERRUPTED)
+        if self.node_limit is not None and stats.nodes >= self.node_limit:
+            raise SearchInterrupted(STATUS_NODE_LIMIT)
+        if self.fail_limit is not None and stats.fails >= self.fail_limit:
+            raise SearchInterrupted(STATUS_FAIL_LIMIT)
+        if self.time_limit is not None and stats.elapsed() >= self.time_limit:
+            raise SearchInterrupted(STATUS_TIME_LIMIT)
+
+    # The current assignment, all variables are fixed
+    def solution(self) -> dict[str, int]:
+        return {v.name: v.domain.value() for v in self.variables}
+
+    def attach_selector(self):
+        picker = self.next_variable_picker
+        if isinstance(picker, VariableSelector):
+            self.selector = picker
+            picker.attach(self)
+            self.trail.on_restore = picker.restored
+        else:
+            self.selector = None
 
     def pre_check(self, unassigned: set[int]) -> bool:
         # all constraints
         forward_checkers = {c.cid for c in self.constraints}
 
-        for vid in unassigned:
-            self.variables[vid].domain.snapshot()
-
         if not self.fix_point(forward_checkers):  # infeasible
             return False
 
         return True  # feasible
 
-    def dfs(self, unassigned: set[int]) -> bool:
+    # return: feasible or not
+    def assume(
+        self, assumptions: list[tuple[int, int]], unassigned: set[int]
+    ) -> bool:
+        for vid, val in assumptions:
+            d = self.variables[vid].domain
+            if not d.contains(val):
+                return False
+            d.assign(val)
+            self.wake(vid)
+            unassigned.discard(vid)
+
+        return self.fix_point()
+
+    # Yield at every solution, the domains hold the solution until resumed.
+    def dfs(self, unassigned: set[int]):
         if len(unassigned) == 0:
-            self.solutions.append(  #
-                {v.name: v.domain._values[0] for v in self.variables}
-            )
-            return True
+            yield
+            return
 
         var = self.next_variable_picker(unassigned, self.variables)
 
         unassigned.remove(var.vid)
 
         ordered_values = self.values_orderer(var.domain.values())
-
-        prev = var.domain.temp_assign(0)  # snapshot before assigning
+        selector = self.selector
 
         for val in ordered_values:
-            var.domain._values[0] = val
+            if self.limited:
+                self.check_limits()
+
+            # only the domains changed below this point are restored by `pop()`
+            self.trail.push()
+            if selector is not None:
+                selector.decided(var.vid, val)
+            var.domain.assign(val)
+
+            self.stats.nodes += 1
+            self.wake(var.vid)
+            feasible = self.fix_point()
+            if selector is not None:
+                selector.propagated(var.vid, val, feasible)
+
+            if feasible:
+                yield from self.dfs(unassigned)
+            else:
+                self.stats.fails += 1
+                if (
+                    self.restart_limit is not None
+                    and self.stats.fails >= self.restart_limit
+                ):
+                    raise SearchRestart()
+
+            self.trail.pop()
 
-            for vid in unassigned:
-                self.variables[vid].domain.snapshot()
+        unassigned.add(var.vid)
+        if selector is not None:
+            selector.unassign(var.vid)
+
+    # `dfs` with conflict-directed backjumping and nogood recording.
+    #
+    # Each domain carries the set of decision levels it depends on (`deps`,
+    #  a bit mask): a decision at level L adds L to its variable, a constraint
+    #  that prunes adds the levels of its whole scope to the pruned variables.
+    #  When a constraint fails, the levels of its scope are the conflict.
+    #
+    # When all values of a variable failed, the conflicts of the values, plus
+    #  the levels that removed values from its domain, explain the dead end:
+    #  - the levels in between are irrelevant, the search jumps back to the
+    #    deepest level of the conflict instead of trying their other values
+    #  - the decisions of these levels are a nogood, recorded in `nogoods`
+    #
+    # return: the conflict of the sub-tree, -1 if it has solutions (no jump)
+    def dfs_cbj(self, unassigned: set[int]):
+        if len(unassigned) == 0:
+            yield
+            return -1
 
-            if self.fix_point(var.affected_constraints.copy()):  # if feasible
-                found_solution = self.dfs(unassigned)
-                if found_solution and not self.find_all:
-                    return True
+        var = self.next_variable_picker(unassigned, self.variables)
+        vid = var.vid
 
-            for vid in unassigned:
-                self.variables[vid].domain.rollback()
+        unassigned.remove(vid)
 
-        unassigned.add(var.vid)
-        var.domain.temp_restore(prev)  # restore the snapshot
+        ordered_values = self.values_orderer(var.domain.values())
+        selector = self.selector
+        deps = self.deps
+        dep_trail = self.dep_trail
+        decisions = self.decisions
+        nogoods = self.nogoods
 
-        return False
+        level = len(decisions) + 1
+        bit = 1 << level
+        conflicts = deps[vid]  # the levels that removed values of `var`
+
+        for val in ordered_values:
+            if self.limited:
+                self.check_limits()
+
+            if nogoods is not None:
+                others = nogoods.blocking(vid, val, self.variables)
+                if others is not None:
+                    for v, _ in others:
+                        conflicts |= deps[v]
+                    continue
+
+            self.trail.push()
+            mark = len(dep_trail)
+            decisions.append((vid, val))
+            if selector is not None:
+                selector.decided(vid, val)
+            var.domain.assign(val)
+            dep_trail.append((vid, deps[vid]))
+            deps[vid] |= bit
+
+            self.stats.nodes += 1
+            self.wake(vid)
+            feasible = self.fix_point()
+            if selector is not None:
+                selector.propagated(vid, val, feasible)
+
+            if feasible:
+                conflict = yield from self.dfs_cbj(unassigned)
+            else:
+                conflict = self.conflict
+                self.stats.fails += 1
+                if (
+                    self.restart_limit is not None
+                    and self.stats.fails >= self.restart_limit
+                ):
+                    raise SearchRestart()
+
+            self.trail.pop()
+            while len(dep_trail) > mark:
+                v, old = dep_trail.pop()
+                deps[v] = old
+            decisions.pop()
+
+            # the failure doesn't depend on this decision, the other
+            #  values would fail the same way
+            if conflict & bit == 0 and conflicts >= 0:
+                self.stats.backjumps += 1
+                unassigned.add(vid)
+                if selector is not None:
+                    selector.unassign(vid)
+                return conflict
+
+            conflicts |= conflict
+
+        conflicts &= ~bit
+        if nogoods is not None and conflicts >= 0:
+            nogoods.add(self.levels_to_decisions(conflicts))
+
+        unassigned.add(vid)
+        if selector is not None:
+            selector.unassign(vid)
+        return conflicts
+
+    def levels_to_decisions(self, levels: int) -> list[tuple[int, int]]:
+        decisions = []
+        while levels:
+            low = levels & -levels
+            decisions.append(self.decisions[low.bit_length() - 2])
+            levels ^= low
+        return decisions
@@ -1,7 +1,7 @@
 from rich import print
 from datetime import datetime
 
-from test_alphametics import parse_question
+from alphametics import parse_question
 
 question = "SEND + MORE = MONEY"  # 0.0009 sec(all, one)
 # question = "I + BB == ILL"
@@ -1,114 +1,20 @@
-from rich import print
-from datetime import datetime
 import unittest
-from variable import Variable
-from constraint import LessThan, SumUp, AllUnique
-from solver import Solver, BTSolver
-
-
-def parse_question(s: str) -> Solver:
-    solver = BTSolver()
-
-    # Split input string by '+' or '=' and clean up
-    lines = [x.strip() for x in s.replace("+", "=").split("=") if x.strip()]
-
-    # Get all unique characters
-    all_chars = [x for x in set("".join(lines))]
-
-    # --------------- Variables ---------------
-    variables = dict[str, Variable]()
-
-    # All characters are 0-9
-    non_0_chars = set(line[0] for line in lines)
-    for ch in all_chars:
-        if ch in non_0_chars:
-            variables[ch] = Variable(ch, list(range(1, 10)))
-        else:
-            variables[ch] = Variable(ch, list(range(0, 10)))
-
-    # Carries
-    max_column = len(lines[-1])
-    max_carry = 0
-    for col in range(max_column - 1):
-        char_count_at_col = sum(1 for line in lines[:-1] if len(line) > col)
-        max_carry = (9 * char_count_at_col + max_carry) // 10
-
-        variables[f"c{col}"] = Variable(f"c{col}", list(range(max_carry + 1)))
-
-    for v in variables.values():
-        solver.add_variable(v)
-
-    # -------------- Constraints ------------
-    # 1. Letters not equal to each other
-    non_carry_variables = [v for v in variables.values() if not v.name.startswith("c")]
-    solver.add_constraints(AllUnique(non_carry_variables))
-
-    # 2. All chars on the left most column must be < the char at last_line[0]
-    # e.g.: for SEND+MORE=GOLD, this means S<G and M<G
-    # If there's only one, then it must == char0_last_line
-    char0_last_line = lines[-1][0]
-    for line in lines[:-1]:
-        if len(line) == max_column:
-            solver.add_constraint(
-                LessThan(
-                    variables[line[0]],
-                    variables[char0_last_line],
-                    include_equal=True,
-                )
-            )
-
-    # 3. Column sum up
-    for col in range(max_column):
-        laddends = []
-        lcoeffs = []
-        raddends = []
-        rcoeffs = []
-
-        for line in lines[:-1]:  # except the last line
-            if col < len(line):
-                char = line[-(col + 1)]
-                laddends.append(variables[char])
-                lcoeffs.append(1)
-
-        # add the sum char as -1*sum_char
-        sum_char = lines[-1][-(col + 1)]
-        raddends.append(variables[sum_char])
-        rcoeffs.append(1)
-
-        # TODO: handle carry greater than 10, such as 20?
-
-        # Add carry from previous column
-        if col > 0:
-            laddends.append(variables[f"c{col - 1}"])
-            lcoeffs.append(1)  # carry is always 1
-
-        # Sub carry for this column
-        if col != max_column - 1:
-            raddends.append(variables[f"c{col}"])
-            rcoeffs.append(10)  # always -10
-
-        solver.add_constraint(SumUp(laddends, lcoeffs, raddends, rcoeffs))
-
-    return solver
+from domain import Domain
+from domain_bitset import BitsetDomain
+from alphametics import parse_question
 
 
 class TestAlphametics(unittest.TestCase):
-    def setUp(self):
-        self.tick = datetime.now()
-
-    def tearDown(self):
-        self.tock = datetime.now()
-        print(self.tock - self.tick)
-
     def solve(self, question: str, solution: bool, expected: dict[str, int]):
-        solver = parse_question(question)
-        # solver.find_all = True
-        solver.solve()
-
-        if len(solver.solutions) == 0:
-            self.assertFalse(solution, f"No solution found for: {question}")
-        else:
-            self.assertDictEqual(solver.solutions[0], expected)
+        for domain_type in [Domain, BitsetDomain]:
+            solver = parse_question(question, domain_type)
+            # solver.find_all = True
+            solver.solve()
+
+            if len(solver.solutions) == 0:
+                self.assertFalse(solution, f"No solution found for: {question}")
+            else:
+                self.assertDictEqual(solver.solutions[0], expected)
 
     def test_send_more_money(self):
         question = "SEND + MORE = MONEY"
@@ -0,0 +1,54 @@
+import unittest
+from alphametics import PUZZLES, parse_question
+from batch import solve_batch
+
+
+class TestBatch(unittest.TestCase):
+    def test_solve_batch(self):
+        puzzles = [
+            PUZZLES["send_more_money"],
+            "A == B",  # infeasible
+            PUZZLES["he_sees_the_light"],
+            parse_question(PUZZLES["as_a_mom"]),  # a model
+            "",  # invalid
+            PUZZLES["no_no_too_late"],
+        ] * 3
+
+        expected = list(solve_batch(puzzles, workers=1))
+        self.assertListEqual([r.index for r in expected], list(range(len(puzzles))))
+        self.assertEqual(len(expected[0].solutions), 1)
+        self.assertEqual(expected[0].stats["status"], "finished")
+        self.assertListEqual(expected[1].solutions, [])
+        self.assertIsNotNone(expected[4].error)
+        self.assertIs(expected[3].input, puzzles[3])
+
+        # the caller's model is left as it was
+        model = puzzles[3]
+        model.find_all = True
+        model.solutions = [{}]
+        r = next(solve_batch([model], workers=1, time_limit=10.0))
+        self.assertListEqual(r.solutions, expected[3].solutions)
+        self.assertListEqual(model.solutions, [{}])
+        self.assertTrue(model.find_all)
+        self.assertIsNone(model.time_limit)
+        model.find_all = False
+        model.solutions = []
+
+        for ordered in [True, False]:
+            results = list(
+                solve_batch(
+                    puzzles, workers=2, chunksize=2, max_in_flight=2, ordered=ordered
+                )
+            )
+            if ordered:
+                self.assertListEqual([r.index for r in results], list(range(len(puzzles))))
+            results.sort(key=lambda r: r.index)
+            for r, e in zip(results, expected):
+                self.assertIs(r.input, puzzles[r.index])
+                self.assertListEqual(r.solutions, e.solutions)
+                self.assertEqual(r.error, e.error)
+
+        # lazily consumed
+        results = solve_batch(iter(puzzles), workers=2, chunksize=1)
+        self.assertEqual(next(results).index, 0)
+        results.close()
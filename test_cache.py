@@ -0,0 +1,45 @@
+import unittest
+from alphametics import canonical, parse_question
+from cache import PuzzleCache
+
+
+class TestCache(unittest.TestCase):
+    def test_canonical(self):
+        self.assertTupleEqual(
+            canonical("TO+GO=OUT"), ("AB + CB == BDA", ["T", "O", "G", "U"])
+        )
+        self.assertEqual(
+            canonical("SEND + MORE = MONEY")[0], canonical("TAXI + CBLA == CBXAZ")[0]
+        )
+
+    def test_cache(self):
+        cache = PuzzleCache(max_models=1)
+        send = { 'S': 9, 'E': 5, 'N': 6, 'M': 1, 'Y': 2, 'D': 7, 'R': 8, 'O': 0, 'c0': 1, 'c1': 1, 'c2': 0, 'c3': 1 }  # fmt: off
+        self.assertListEqual(cache.solve("SEND + MORE = MONEY"), [send])
+
+        # same pattern, the solution is mapped to the new letters
+        renamed = dict(zip("SENDMORY", "TAXICBLZ"))
+        taxi = {renamed.get(k, k): v for k, v in send.items()}
+        self.assertListEqual(cache.solve("TAXI + CBLA = CBXAZ"), [taxi])
+        self.assertDictEqual(
+            cache.stats(),
+            { "models": 1, "results": 1, "model_hits": 0, "model_misses": 1, "result_hits": 1, "result_misses": 1 },
+        )  # fmt: skip
+
+        # all solutions, the model is reused
+        solver = parse_question("AB + CD == EFG")
+        solver.find_all = True
+        solver.solve()
+        cache.solve("AB + CD == EFG", find_all=True)
+        renamed = dict(zip("ABCDEFG", "KLMNOPQ"))
+        solutions = cache.solve("KL + MN == OPQ", find_all=True)
+        self.assertCountEqual(
+            solutions, [{renamed.get(k, k): v for k, v in s.items()} for s in solver.solutions]
+        )
+        self.assertEqual(cache.stats()["model_misses"], 2)
+
+        # bounded, SEND + MORE is evicted
+        self.assertEqual(len(cache.models), 1)
+        cache.results.clear()
+        cache.solve("SEND + MORE = MONEY")
+        self.assertEqual(cache.stats()["model_misses"], 3)
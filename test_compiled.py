@@ -0,0 +1,68 @@
+import unittest
+from alphametics import parse_question
+from compiled import compile_model
+from constraint import Constraint, LessThan
+from solver import BTSolver
+from variable import Variable
+
+
+def as_set(solutions: list[dict[str, int]]) -> set:
+    return set(tuple(sorted(s.items())) for s in solutions)
+
+
+class TestCompiled(unittest.TestCase):
+    def test_same_solutions(self):
+        for question in [
+            "SEND + MORE = MONEY",
+            "AB + CD == EFG",  # many solutions
+            "A == B",  # infeasible
+        ]:
+            solver = parse_question(question)
+            solver.find_all = True
+            solver.solve()
+
+            model = compile_model(parse_question(question))
+            # solved many times
+            for _ in range(2):
+                self.assertSetEqual(as_set(model.solve(find_all=True)), as_set(solver.solutions))
+            self.assertEqual(model.count(), len(solver.solutions))
+
+        model = compile_model(parse_question("AB + CD == EFG"))
+        a = model.names.index("A")
+        for solution in model.solve(find_all=True, assumptions=[(a, 3)]):
+            self.assertEqual(solution["A"], 3)
+        self.assertEqual(model.count(limit=2), 2)
+        # values out of every domain, like `BTSolver.assume()`
+        self.assertListEqual(model.solve(assumptions=[(a, model.base - 1)]), [])
+        self.assertEqual(model.count(assumptions=[(a, 100)]), 0)
+
+    def test_less_than(self):
+        # x < y < z in 0..2 (`include_equal=True` is strict), x <= w
+        solver = BTSolver()
+        x, y, z, w = [Variable(n, [0, 1, 2]) for n in "xyzw"]
+        solver.add_variables([x, y, z, w])
+        solver.add_constraint(LessThan(x, y, include_equal=True))
+        solver.add_constraint(LessThan(y, z, include_equal=True))
+        solver.add_constraint(LessThan(x, w))
+        model = compile_model(solver)
+        self.assertListEqual(
+            model.solve(find_all=True),
+            [{"x": 0, "y": 1, "z": 2, "w": w} for w in [0, 1, 2]],
+        )
+
+    def test_unsupported(self):
+        class Custom(Constraint):
+            def affected_variables(self):
+                return set()
+
+            def prune(self, variables):
+                return True, []
+
+            def __repr__(self):
+                return "Custom"
+
+        solver = BTSolver()
+        solver.add_variable(Variable("x", [0, 1]))
+        solver.add_constraint(Custom())
+        with self.assertRaises(TypeError):
+            compile_model(solver)
@@ -1,7 +1,8 @@
 import unittest
 from random import shuffle
 from itertools import combinations
-from constraint import NotEqual, Equal, SumUp
+import constraint
+from constraint import NotEqual, Equal, SumUp, VectorSumUp, AllDifferent, Table
 from variable import Variable
 
 
@@ -61,3 +62,178 @@ class TestConstraint(unittest.TestCase):
         self.assertListEqual(sorted(a.domain.values()), [1, 2])
         self.assertListEqual(sorted(b.domain.values()), [1, 2])
         self.assertListEqual(sorted(c.domain.values()), [2, 3])
+
+    def test_vector_sum_up(self):
+        n = SumUp.VECTOR_ARITY
+
+        # x0 + 2*x1 + 3*x2 + ... == 10*y, some values fixed
+        def prune(vector: bool):
+            xs = [Variable(f"x{i}", list(range(10))) for i in range(n)]
+            y = Variable("y", list(range(100)))
+            variables = xs + [y]
+            for vid, v in enumerate(variables):
+                v.vid = vid
+            for x in xs[: n // 2]:
+                x.domain.assign(0)
+            for v in variables:
+                v.domain.snapshot()
+            y.domain.assign(3)
+
+            arity = SumUp.VECTOR_ARITY
+            if not vector:
+                SumUp.VECTOR_ARITY = len(variables) + 1
+            try:
+                cs = SumUp(xs, [i % 5 + 1 for i in range(n)], [y], [10])
+            finally:
+                SumUp.VECTOR_ARITY = arity
+            cs.cid = 0
+
+            feasible, changed = cs.prune(variables)
+            domains = [list(v.domain.values()) for v in variables]
+
+            # the bounds cached by the first call follow the restored domains
+            for v in variables:
+                v.domain.rollback()
+            y.domain.assign(2)
+            feasible2, changed2 = cs.prune(variables)
+            domains2 = [list(v.domain.values()) for v in variables]
+            return type(cs), feasible, sorted(changed), domains, feasible2, sorted(changed2), domains2
+
+        scalar = prune(vector=False)
+        vector = prune(vector=True)
+        self.assertIs(scalar[0], SumUp)
+        if constraint.np is not None:
+            self.assertIs(vector[0], VectorSumUp)
+        self.assertTrue(scalar[1])
+        self.assertGreater(len(scalar[2]), 0)
+        self.assertTupleEqual(vector[1:], scalar[1:])
+
+    def test_all_different(self):
+        print("Testing AllDifferent Constraint")
+        for consistency in ["bounds", "domain"]:
+            a = Variable("A", [1, 2])
+            b = Variable("B", [1, 2])
+            c = Variable("C", [1, 2, 3, 4])
+            d = Variable("D", [2, 3, 4])
+            a.vid = 0
+            b.vid = 1
+            c.vid = 2
+            d.vid = 3
+            variables = [a, b, c, d]
+
+            cs = AllDifferent(variables, consistency)
+            cs.cid = 0
+
+            feasible, changed = cs.prune(variables)
+
+            # {A, B} is a Hall set of {1, 2}
+            self.assertTrue(feasible)
+            self.assertListEqual(sorted(changed), [2, 3])
+            self.assertListEqual(sorted(c.domain.values()), [3, 4])
+            self.assertListEqual(sorted(d.domain.values()), [3, 4])
+
+    def test_all_different_infeasible(self):
+        print("Testing AllDifferent Constraint (infeasible)")
+        for consistency in ["bounds", "domain"]:
+            variables = [Variable(n, [1, 2]) for n in "ABC"]
+            for i, v in enumerate(variables):
+                v.vid = i
+
+            cs = AllDifferent(variables, consistency)
+            cs.cid = 0
+
+            feasible, _ = cs.prune(variables)
+            self.assertFalse(feasible)
+
+    def test_table(self):
+        print("Testing Table Constraint")
+        from solver import BTSolver
+
+        # without a trail, from scratch
+        x = Variable("X", [1, 2, 3])
+        y = Variable("Y", [2, 3])
+        x.vid = 0
+        y.vid = 1
+        cs = Table([x, y], [(1, 2), (3, 1)])
+        cs.cid = 0
+        feasible, changed = cs.prune([x, y])
+        self.assertTrue(feasible)
+        self.assertListEqual(changed, [0, 1])
+        self.assertListEqual(list(x.domain.values()), [1])
+        self.assertListEqual(list(y.domain.values()), [2])
+
+        # restored with the domains
+        tuples = [(1, 1, 2), (1, 2, 3), (2, 3, 1), (3, 3, 3)]
+        solver = BTSolver()
+        x, y, z = [Variable(n, [1, 2, 3]) for n in "XYZ"]
+        solver.add_variables([x, y, z])
+        table = Table([x, y, z], tuples)
+        solver.add_constraint(table)
+        solver.add_constraint(NotEqual(x, z))
+        solver.find_all = True
+        solver.solve()
+        self.assertListEqual(
+            sorted((s["X"], s["Y"], s["Z"]) for s in solver.solutions),
+            [(1, 1, 2), (1, 2, 3), (2, 3, 1)],
+        )
+        self.assertEqual(table.current, table.all)
+        self.assertEqual(solver.count(), 3)
+
+        with self.assertRaises(ValueError):
+            Table([x, y], [(1, 2, 3)])
+
+        # unary, the only column is checked on the first call
+        solver = BTSolver()
+        x = Variable("X", [1, 2, 3])
+        solver.add_variable(x)
+        solver.add_constraint(Table([x], [(1,), (2,)]))
+        self.assertTrue(solver.fix_point({0}))
+        self.assertListEqual(sorted(x.domain.values()), [1, 2])
+
+    def test_interval(self):
+        print("Testing bounds propagation on IntervalDomain")
+        from solver import BTSolver
+        from domain import Domain
+        from domain_interval import IntervalDomain
+        from constraint import LessThan
+
+        solver = BTSolver()
+        x, y, z = [Variable(n, range(10**6)) for n in "XYZ"]
+        w = Variable("W", [3, 7, 500000, 2000000])
+        solver.add_variables([x, y, z, w])
+        self.assertIsInstance(x.domain, IntervalDomain)
+        self.assertIsInstance(Variable("S", range(10)).domain, Domain)
+
+        solver.add_constraint(LessThan(x, y, include_equal=True))  # x < y
+        solver.add_constraint(SumUp([x, y], [1, 1], [z], [1]))  # x + y == z
+        solver.add_constraint(Equal(z, w))
+        self.assertTrue(solver.fix_point({c.cid for c in solver.constraints}))
+        self.assertEqual((x.domain.min(), x.domain.max()), (0, 499999))
+        self.assertEqual((y.domain.min(), y.domain.max()), (1, 500000))
+        self.assertEqual((z.domain.min(), z.domain.max()), (3, 500000))
+        self.assertListEqual(list(w.domain.values()), [3, 7, 500000])
+
+        solver.solve()
+        s = solver.solutions[0]
+        self.assertLess(s["X"], s["Y"])
+        self.assertEqual(s["X"] + s["Y"], s["Z"])
+        self.assertEqual(s["Z"], s["W"])
+
+    def test_slots(self):
+        print("Testing slotted constraints and the solver's name table")
+        from solver import BTSolver
+
+        solver = BTSolver()
+        a = Variable("A", [1, 2])
+        b = Variable("B", [1, 2])
+        solver.add_variable(a)
+        solver.add_variable(b)
+        cs = NotEqual(a, b)
+        solver.add_constraint(cs)
+
+        self.assertFalse(hasattr(cs, "__dict__"))
+        self.assertFalse(hasattr(a, "__dict__"))
+        self.assertFalse(hasattr(a.domain, "__dict__"))
+        self.assertIs(cs.names, solver.names)
+        self.assertIn("A", repr(cs))
+        self.assertIn("B", repr(cs))
@@ -2,6 +2,9 @@ import unittest
 from random import shuffle
 from itertools import combinations
 from domain import Domain
+from domain_bitset import BitsetDomain
+from domain_interval import IntervalDomain
+from event import EVT_DOMAIN, EVT_BOUND, EVT_FIX
 
 
 class TestDomain(unittest.TestCase):
@@ -46,3 +49,98 @@ class TestDomain(unittest.TestCase):
                 self.assertListEqual(sorted(list(d.values())), copy)
                 self.assertEqual(d.barrier, len(copy))
                 self.assertEqual(len(d.snapshots), 0)
+
+    def test_Domain_bounds(self):
+        d = Domain(list(range(0, 10)))
+        self.assertEqual((d.min(), d.max()), (0, 9))
+
+        d.snapshot()
+        d.remove([0, 9])  # removes 0 and 9
+        self.assertEqual((d.min(), d.max()), (1, 8))
+
+        d.snapshot()
+        d.remove([i for i, v in enumerate(d.values()) if v != 5])
+        self.assertEqual((d.min(), d.max()), (5, 5))
+
+        d.rollback()
+        self.assertEqual((d.min(), d.max()), (1, 8))
+
+        prev = d.temp_assign(3)
+        self.assertEqual((d.min(), d.max()), (3, 3))
+        d.temp_restore(prev)
+        self.assertEqual((d.min(), d.max()), (1, 8))
+
+        d.rollback()
+        self.assertEqual((d.min(), d.max()), (0, 9))
+
+    def test_BitsetDomain(self):
+        values = [3, 5, 6, 9]
+        d = BitsetDomain(values)
+        self.assertListEqual(list(d.values()), values)
+        self.assertEqual((d.len(), d.min(), d.max()), (4, 3, 9))
+
+        d.snapshot()
+        d.remove([0, 3])  # removes 3 and 9
+        self.assertListEqual(list(d.values()), [5, 6])
+        self.assertEqual((d.len(), d.min(), d.max()), (2, 5, 6))
+
+        prev = d.temp_assign(6)
+        self.assertListEqual(list(d.values()), [6])
+        self.assertEqual(d.value(), 6)
+        d.temp_restore(prev)
+
+        d.rollback()
+        self.assertListEqual(list(d.values()), values)
+        self.assertEqual(len(d.snapshots), 0)
+
+    def test_IntervalDomain(self):
+        d = IntervalDomain(range(0, 10**6))
+        self.assertEqual((d.len(), d.min(), d.max()), (10**6, 0, 10**6 - 1))
+
+        d.snapshot()
+        self.assertTrue(d.clamp(10, 20))
+        self.assertEqual((d.len(), d.min(), d.max()), (11, 10, 20))
+
+        d.snapshot()
+        d.remove([0, 5])  # removes 10 and 15, a hole
+        self.assertListEqual(list(d.values()), [11, 12, 13, 14, 16, 17, 18, 19, 20])
+        self.assertFalse(d.contains(15))
+
+        # the bounds skip the holes
+        self.assertTrue(d.clamp(15, 30))
+        self.assertEqual((d.len(), d.min(), d.max()), (5, 16, 20))
+        self.assertFalse(d.clamp(21, 30))  # nothing left, unchanged
+        self.assertEqual(d.len(), 5)
+
+        prev = d.temp_assign(18)
+        self.assertListEqual(list(d.values()), [18])
+        self.assertEqual(d.value(), 18)
+        d.temp_restore(prev)
+        self.assertListEqual(list(d.values()), [16, 17, 18, 19, 20])
+
+        d.rollback()
+        self.assertEqual((d.len(), d.min(), d.max()), (11, 10, 20))
+        self.assertTrue(d.contains(15))
+        d.rollback()
+        self.assertEqual(d.len(), 10**6)
+        self.assertEqual(len(d.snapshots), 0)
+
+        # from a list, the missing values are holes
+        d = IntervalDomain([3, 5, 6, 9])
+        self.assertListEqual(list(d.values()), [3, 5, 6, 9])
+        self.assertEqual((d.len(), d.min(), d.max()), (4, 3, 9))
+
+    def test_events(self):
+        for domain_type in [Domain, BitsetDomain, IntervalDomain]:
+            d = domain_type([1, 2, 3, 4])
+
+            # a value in the middle
+            pos = [i for i, v in enumerate(d.values()) if v == 2]
+            self.assertEqual(d.remove(pos), EVT_DOMAIN)
+
+            # the max
+            pos = [i for i, v in enumerate(d.values()) if v == 4]
+            self.assertEqual(d.remove(pos), EVT_DOMAIN | EVT_BOUND)
+
+            self.assertEqual(d.assign(3), EVT_DOMAIN | EVT_BOUND | EVT_FIX)
+            self.assertEqual(d.events, EVT_DOMAIN | EVT_BOUND | EVT_FIX)
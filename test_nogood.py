@@ -0,0 +1,31 @@
+import unittest
+from nogood import NogoodStore
+from variable import Variable
+
+
+class TestNogood(unittest.TestCase):
+    def test_nogood_store(self):
+        variables = [Variable(f"x{i}", [0, 1, 2]) for i in range(3)]
+        for vid, v in enumerate(variables):
+            v.vid = vid
+            v.domain.vid = vid
+
+        store = NogoodStore(capacity=2, max_length=2)
+        self.assertTrue(store.add([(0, 1), (1, 2)]))
+        self.assertFalse(store.add([(0, 1), (1, 2), (2, 0)]))  # too long
+
+        # x0 isn't fixed yet
+        self.assertIsNone(store.blocking(1, 2, variables))
+        variables[0].domain.assign(1)
+        self.assertTupleEqual(store.blocking(1, 2, variables), ((0, 1),))
+        self.assertIsNone(store.blocking(1, 0, variables))
+
+        # the least recently used one is evicted
+        self.assertTrue(store.add([(2, 0)]))
+        self.assertTrue(store.add([(2, 1)]))
+        self.assertEqual(len(store), 2)
+        self.assertIsNotNone(store.blocking(2, 0, variables))
+        self.assertIsNone(store.blocking(1, 2, variables))
+        self.assertDictEqual(
+            store.stats(), {"size": 2, "added": 3, "evicted": 1, "hits": 2}
+        )
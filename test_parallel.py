@@ -0,0 +1,67 @@
+import unittest
+from parallel import solve_parallel, split
+from alphametics import parse_question
+from nogood import NogoodStore
+
+
+class TestParallel(unittest.TestCase):
+    def test_split(self):
+        question = "AB + CD == EFG"  # many solutions
+        solver = parse_question(question)
+        solver.find_all = True
+        solver.solve()
+        expected = solver.solutions
+
+        cubes = split(solver, 8)
+        self.assertGreaterEqual(len(cubes), 8)
+
+        # the cubes cover the whole tree, in search order
+        solutions = []
+        for cube in cubes:
+            solver.solutions = []
+            solver.solve(assumptions=cube)
+            solutions.extend(solver.solutions)
+        self.assertEqual(len(solutions), len(expected))
+        self.assertCountEqual(solutions, expected)
+
+        # split on the variables of the solver's picker
+        solver = parse_question(question)
+        first = lambda unassigned, variables: variables[min(unassigned)]
+        solver.next_variable_picker = first
+        for cube in split(solver, 8):
+            vids = [vid for vid, _ in cube]
+            self.assertListEqual(vids, sorted(vids))
+
+    def test_solve_parallel(self):
+        question = "HE + SEES + THE == LIGHT"
+        expected = { 'S': 9, 'G': 2, 'E': 4, 'H': 5, 'L': 1, 'I': 0, 'T': 7, 'c0': 1, 'c1': 1, 'c2': 1, 'c3': 1 }  # fmt: off
+
+        for find_all in [False, True]:
+            for deterministic in [False, True]:
+                solver = parse_question(question)
+                solver.find_all = find_all
+                solutions = solve_parallel(solver, workers=2, deterministic=deterministic)
+                self.assertListEqual(solutions, [expected])
+                self.assertListEqual(solver.solutions, [expected])
+
+    def test_solve_parallel_deterministic(self):
+        question = "AB + CD == EFG"
+        solver = parse_question(question)
+        solver.find_all = True
+        solutions = solve_parallel(solver, workers=3)
+
+        # the first solution is the first one of the lowest cube
+        solver = parse_question(question)
+        first = solve_parallel(solver, workers=3)
+        self.assertListEqual(first, solutions[:1])
+
+    def test_solve_parallel_nogoods(self):
+        # a worker solves many cubes with the same solver, the nogoods found
+        #  under one cube don't cut the others
+        question = "AB + CD == EFG"
+        total = parse_question(question).count()
+        solver = parse_question(question)
+        solver.find_all = True
+        solver.backjumping = True
+        solver.nogoods = NogoodStore()
+        self.assertEqual(len(solve_parallel(solver, workers=2)), total)
@@ -0,0 +1,46 @@
+import unittest
+from alphametics import parse_question
+from profiler import Profiler
+
+
+class TestProfiler(unittest.TestCase):
+    def test_profiler(self):
+        solver = parse_question("SEND + MORE = MONEY")
+        constraints = solver.constraints
+
+        pruned = []
+        fix_points = []
+        profiler = Profiler(
+            on_prune=lambda c, seconds, removed, feasible: pruned.append(
+                (c.cid, removed, feasible)
+            ),
+            on_fix_point=lambda iterations, feasible: fix_points.append(iterations),
+        )
+        with profiler.attach(solver):
+            solver.solve()
+        self.assertEqual(len(solver.solutions), 1)
+
+        # detached
+        self.assertIs(solver.constraints, constraints)
+        self.assertNotIn("fix_point", solver.__dict__)
+
+        r = profiler.report()
+        self.assertEqual(r["fix_points"], len(fix_points))
+        self.assertEqual(r["iterations"], len(pruned))
+        self.assertEqual(r["max_iterations"], max(fix_points))
+
+        rows = {row["cid"]: row for row in r["constraints"]}
+        for cid in range(len(constraints)):
+            row = rows[cid]
+            self.assertEqual(row["calls"], sum(1 for p in pruned if p[0] == cid))
+            self.assertEqual(row["removed"], sum(p[1] for p in pruned if p[0] == cid))
+            self.assertEqual(
+                row["failures"], sum(1 for p in pruned if p[0] == cid and not p[2])
+            )
+        self.assertEqual(sum(row["failures"] for row in rows.values()), solver.stats.fails)
+
+        classes = r["classes"]
+        self.assertEqual(classes["SumUp"]["count"], 5)
+        self.assertEqual(
+            sum(t["calls"] for t in classes.values()), r["iterations"]
+        )
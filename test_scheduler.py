@@ -0,0 +1,42 @@
+import unittest
+from scheduler import Scheduler, PRIORITY_BINARY, PRIORITY_LINEAR, PRIORITY_GLOBAL
+
+
+class TestScheduler(unittest.TestCase):
+    def test_scheduler(self):
+        s = Scheduler()
+        s.register(PRIORITY_GLOBAL)  # cid 0
+        s.register(PRIORITY_LINEAR)  # cid 1
+        s.register(PRIORITY_BINARY)  # cid 2
+        s.register(PRIORITY_BINARY)  # cid 3
+
+        for cid in [0, 1, 3, 2, 1, 0]:
+            s.push(cid)
+        self.assertEqual(len(s), 4)
+
+        # cheap first, FIFO inside the same priority
+        self.assertListEqual([s.pop() for _ in range(5)], [3, 2, 1, 0, -1])
+
+        stats = s.stats()
+        self.assertEqual(stats["pushes"], 4)
+        self.assertEqual(stats["duplicates"], 2)
+        self.assertDictEqual(stats["pops"], {"binary": 2, "linear": 1, "global": 1})
+        self.assertEqual(stats["max_size"], 4)
+
+        s.push(0)
+        s.clear()
+        self.assertEqual(s.pop(), -1)
+        s.push(0)  # not considered queued after `clear()`
+        self.assertEqual(s.pop(), 0)
+
+    def test_stats_per_search(self):
+        from alphametics import parse_question
+
+        fresh = parse_question("SEND + MORE = MONEY")
+        fresh.solve()
+
+        # counted from the start of each search, like `solver.stats`
+        solver = parse_question("SEND + MORE = MONEY")
+        solver.solve()
+        solver.solve()
+        self.assertDictEqual(solver.scheduler.stats(), fresh.scheduler.stats())
@@ -0,0 +1,36 @@
+import unittest
+from selector import MRVSelector, DomWDegSelector, ImpactSelector
+from solver import Degree_MRV
+from alphametics import parse_question
+
+
+class TestSelector(unittest.TestCase):
+    def test_selectors(self):
+        question = "SEND + MORE = MONEY"
+        expected = { 'S': 9, 'E': 5, 'N': 6, 'M': 1, 'Y': 2, 'D': 7, 'R': 8, 'O': 0, 'c0': 1, 'c1': 1, 'c2': 0, 'c3': 1 }  # fmt: off
+
+        for picker in [Degree_MRV, MRVSelector(), DomWDegSelector(), ImpactSelector()]:
+            solver = parse_question(question)
+            solver.next_variable_picker = picker
+            solver.find_all = True
+            solver.solve()
+            self.assertListEqual(solver.solutions, [expected])
+
+    def test_mrv_order(self):
+        solver = parse_question("SEND + MORE = MONEY")
+        selector = MRVSelector()
+        selector.attach(solver)
+        unassigned = set(v.vid for v in solver.variables)
+
+        # carries have the smallest domains: {0, 1}
+        self.assertTrue(selector(unassigned, solver.variables).name.startswith("c"))
+
+        # the domain of `S` shrinks to 1 value
+        s = next(v for v in solver.variables if v.name == "S")
+        s.domain.assign(9)
+        selector.update(s.vid)
+        self.assertEqual(selector(unassigned, solver.variables).name, "S")
+
+        # assigned variables are skipped
+        unassigned.remove(s.vid)
+        self.assertTrue(selector(unassigned, solver.variables).name.startswith("c"))
@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+from alphametics import parse_question
+from constraint import AllDifferent, Equal, LessThan, NotEqual, Table
+from domain_bitset import BitsetDomain
+from serialize import dumps, load, loads, save
+from solver import BTSolver
+from variable import Variable
+
+
+def describe(solver: BTSolver) -> list:
+    variables = [
+        (v.name, list(v.domain.values()), type(v.domain), sorted(v.affected_constraints))
+        for v in solver.variables
+    ]
+    constraints = [(type(c), repr(c), c.cid) for c in solver.constraints]
+    return [variables, constraints]
+
+
+class TestSerialize(unittest.TestCase):
+    def test_round_trip(self):
+        solver = parse_question("SEND + MORE = MONEY", BitsetDomain)
+        model = loads(dumps(solver))
+        self.assertListEqual(describe(model), describe(solver))
+        model.solve()
+        solver.solve()
+        self.assertListEqual(model.solutions, solver.solutions)
+
+        # all kinds of constraints
+        solver = BTSolver()
+        a, b, c, d = [Variable(n, [0, 1, 2, 3]) for n in "abcd"]
+        solver.add_variables([a, b, c, d])
+        solver.add_constraints(
+            [
+                LessThan(a, b),
+                LessThan(b, c, include_equal=True),
+                Equal(c, d),
+                NotEqual(a, d),
+                AllDifferent([a, b, c], "bounds"),
+                Table([a, d], [(0, 2), (0, 3), (1, 3)]),
+            ]
+        )
+        model = loads(dumps(solver))
+        self.assertListEqual(describe(model), describe(solver))
+        self.assertTrue(model.constraints[1].include_equal)
+        self.assertEqual(model.constraints[4].consistency, "bounds")
+        self.assertListEqual(model.constraints[5].tuples, [(0, 2), (0, 3), (1, 3)])
+        solver.find_all = model.find_all = True
+        solver.solve()
+        model.solve()
+        self.assertListEqual(model.solutions, solver.solutions)
+
+    def test_interval(self):
+        solver = BTSolver()
+        x = Variable("x", range(10**6))
+        y = Variable("y", [1, 2, 3])
+        solver.add_variables([x, y])
+        x.domain.remove([5])  # a hole at 5
+        solver.add_constraint(LessThan(x, y, include_equal=True))
+        model = loads(dumps(solver))
+        self.assertListEqual(describe(model)[1], describe(solver)[1])
+        d = model.variables[0].domain
+        self.assertIs(type(d), type(x.domain))
+        self.assertEqual((d.len(), d.min(), d.max()), (10**6 - 1, 0, 10**6 - 1))
+        self.assertFalse(d.contains(5))
+
+    def test_file(self):
+        solver = parse_question("AB + CD == EFG")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "model.bin")
+            save(solver, path)
+            model = load(path)
+        self.assertListEqual(describe(model), describe(solver))
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            loads(b"XXXX" + bytes(12))
+        data = dumps(parse_question("SEND + MORE = MONEY"))
+        with self.assertRaises(ValueError):
+            loads(data[:-8])
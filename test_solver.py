@@ -0,0 +1,297 @@
+import unittest
+from threading import Event
+from restart import LubySchedule, GeometricSchedule, luby
+from alphametics import parse_question
+from solver import (
+    BTSolver,
+    STATUS_FINISHED,
+    STATUS_INTERRUPTED,
+    STATUS_NODE_LIMIT,
+    STATUS_FAIL_LIMIT,
+    STATUS_TIME_LIMIT,
+)
+from variable import Variable
+from constraint import NotEqual
+from nogood import NogoodStore
+from selector import DomWDegSelector
+
+
+class TestSolver(unittest.TestCase):
+    def test_solve_iter(self):
+        question = "AB + CD == EFG"  # many solutions
+        solver = parse_question(question)
+        solver.find_all = True
+        solver.solve()
+        expected = solver.solutions
+
+        initial = [list(v.domain.values()) for v in solver.variables]
+
+        solutions = []
+        for solution in solver.solve_iter():
+            # the search is suspended at the solution
+            for v in solver.variables:
+                self.assertEqual(v.domain.len(), 1)
+                self.assertEqual(v.domain.value(), solution[v.name])
+            solutions.append(solution)
+        self.assertListEqual(solutions, expected)
+
+        # stop early, the model is restored
+        it = solver.solve_iter()
+        self.assertDictEqual(next(it), expected[0])
+        it.close()
+        self.assertListEqual([list(v.domain.values()) for v in solver.variables], initial)
+
+        # limit
+        self.assertListEqual(list(solver.solve_iter(limit=3)), expected[:3])
+        self.assertListEqual([list(v.domain.values()) for v in solver.variables], initial)
+
+    def test_count(self):
+        solver = parse_question("AB + CD == EFG")
+        solver.find_all = True
+        solver.solve()
+        total = len(solver.solutions)
+
+        self.assertEqual(solver.count(), total)
+        self.assertEqual(solver.count(limit=2), 2)
+
+        # unique
+        solver = parse_question("SEND + MORE = MONEY")
+        self.assertEqual(solver.count(limit=2), 1)
+
+        # infeasible
+        solver = parse_question("A == B")
+        self.assertEqual(solver.count(), 0)
+
+    def test_solve_restarts(self):
+        question = "AND + A + STRONG + OFFENSE + AS + A + GOOD == DEFENSE"
+        expected = { "S": 6, "G": 8, "A": 5, "E": 4, "N": 0, "F": 7, "D": 3, "R": 1, "T": 9, "O": 2, "c0": 3, "c1": 1, "c2": 1, "c3": 1, "c4": 1, "c5": 1, }  # fmt: off
+
+        for schedule in [LubySchedule(2), GeometricSchedule(2, 2)]:
+            solver = parse_question(question)
+            solution = solver.solve_restarts(schedule, seed=1)
+            self.assertDictEqual(solution, expected)
+            self.assertListEqual(solver.solutions, [expected])
+            self.assertGreater(solver.stats.restarts, 0)
+
+        # infeasible
+        solver = parse_question("A == B")
+        self.assertIsNone(solver.solve_restarts(LubySchedule(1), seed=1))
+
+        # a function picker is only replaced for the call
+        solver = parse_question(question)
+        picker = lambda unassigned, variables: variables[min(unassigned)]
+        solver.next_variable_picker = picker
+        self.assertDictEqual(solver.solve_restarts(LubySchedule(2), seed=1), expected)
+        self.assertIs(solver.next_variable_picker, picker)
+        self.assertEqual(solver.count(), 1)
+
+        # the default picker doesn't learn, it's left as it was
+        question = "AB + CD == EFG"
+        fresh = parse_question(question)
+        fresh.solve()
+        solver = parse_question(question)
+        picker = solver.next_variable_picker
+        solver.solve_restarts(LubySchedule(2), seed=7)
+        self.assertIs(solver.next_variable_picker, picker)
+        solver.solutions = []
+        solver.solve()
+        self.assertListEqual(solver.solutions, fresh.solutions)
+
+        # a learning selector keeps its weights, not the random tie-breaking
+        solver = parse_question(question)
+        selector = DomWDegSelector()
+        solver.next_variable_picker = selector
+        solver.solve_restarts(LubySchedule(1), seed=7)
+        self.assertGreater(solver.stats.restarts, 0)
+        self.assertGreater(sum(selector.weights), len(solver.constraints))
+        solver.next_variable_picker = DomWDegSelector()
+        solver.solutions = []
+        solver.solve()
+        expected = solver.solutions
+        solver.next_variable_picker = selector
+        selector.weights = [1] * len(solver.constraints)
+        solver.solutions = []
+        solver.solve()
+        self.assertListEqual(solver.solutions, expected)
+
+    def test_luby(self):
+        self.assertListEqual([luby(i) for i in range(1, 16)], [1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8])
+
+    def test_backjumping(self):
+        def model():
+            # 3 pigeons in 2 holes, after some unrelated variables
+            solver = BTSolver()
+            free = [Variable(f"x{i}", list(range(5))) for i in range(3)]
+            pigeons = [Variable(f"p{i}", [0, 1]) for i in range(3)]
+            solver.add_variables(free + pigeons)
+            solver.add_constraint(NotEqual(free[0], free[1]))
+            for i in range(3):
+                for j in range(i + 1, 3):
+                    solver.add_constraint(NotEqual(pigeons[i], pigeons[j]))
+            solver.next_variable_picker = lambda unassigned, variables: variables[
+                min(unassigned)
+            ]
+            return solver
+
+        plain = model()
+        self.assertEqual(plain.count(), 0)
+
+        # the conflict doesn't involve x0..x2, it jumps to the root
+        solver = model()
+        solver.backjumping = True
+        self.assertEqual(solver.count(), 0)
+        self.assertLess(solver.stats.nodes, plain.stats.nodes)
+        self.assertGreater(solver.stats.backjumps, 0)
+
+        # same solutions
+        question = "AB + CD == EFG"
+        expected = parse_question(question)
+        expected.find_all = True
+        expected.solve()
+        for nogoods in [None, NogoodStore()]:
+            solver = parse_question(question)
+            solver.find_all = True
+            solver.backjumping = True
+            solver.nogoods = nogoods
+            solver.solve()
+            self.assertListEqual(solver.solutions, expected.solutions)
+
+        # nogoods are kept across restarts, and reused by the next ones
+        question = "AND + A + STRONG + OFFENSE + AS + A + GOOD == DEFENSE"
+        solver = parse_question(question)
+        solver.backjumping = True
+        solver.nogoods = NogoodStore()
+        self.assertIsNotNone(solver.solve_restarts(LubySchedule(2), seed=1))
+        self.assertGreater(solver.nogoods.added, 0)
+        self.assertGreater(solver.nogoods.hits, 0)
+        # they don't cut any solution
+        self.assertEqual(solver.count(), parse_question(question).count())
+
+        # the nogoods found under assumptions don't cut later searches
+        question = "AB + CD == EFG"
+        total = parse_question(question).count()
+        solver = parse_question(question)
+        solver.backjumping = True
+        solver.nogoods = NogoodStore()
+        a = [v for v in solver.variables if v.name == "A"][0]
+        counts = [solver.count(assumptions=[(a.vid, val)]) for val in range(1, 10)]
+        self.assertEqual(sum(counts), total)
+        self.assertEqual(solver.count(), total)
+
+    def test_limits(self):
+        question = "AB + CD == EFG"
+        solver = parse_question(question)
+        solver.find_all = True
+        solver.solve()
+        self.assertEqual(solver.status, STATUS_FINISHED)
+        self.assertFalse(solver.interrupted)
+        total = len(solver.solutions)
+        initial = [list(v.domain.values()) for v in solver.variables]
+
+        for attr, value, status in [
+            ("node_limit", 200, STATUS_NODE_LIMIT),
+            ("fail_limit", 50, STATUS_FAIL_LIMIT),
+            ("time_limit", 0.0, STATUS_TIME_LIMIT),
+            ("interrupt", Event(), STATUS_INTERRUPTED),
+        ]:
+            solver = parse_question(question)
+            solver.find_all = True
+            setattr(solver, attr, value)
+            if attr == "interrupt":
+                value.set()
+            solver.solve()
+
+            self.assertEqual(solver.status, status)
+            self.assertTrue(solver.interrupted)
+            self.assertLess(len(solver.solutions), total)
+            if attr == "node_limit":
+                self.assertEqual(solver.stats.nodes, value)
+                self.assertGreater(len(solver.solutions), 0)  # found so far
+            if attr == "fail_limit":
+                self.assertEqual(solver.stats.fails, value)
+
+            # restored, it can be solved again
+            self.assertListEqual([list(v.domain.values()) for v in solver.variables], initial)
+            setattr(solver, attr, None)
+            solver.solutions = []
+            solver.solve()
+            self.assertEqual(solver.status, STATUS_FINISHED)
+            self.assertEqual(len(solver.solutions), total)
+
+    def test_bulk_build(self):
+        print("Testing columnar model building")
+        rows = [(0, 1), (0, 2), (1, 2), (2, 3)]
+
+        # one by one
+        one = BTSolver()
+        for i in range(4):
+            one.add_variable(Variable(f"x{i}", [1, 2, 3]))
+        for x, y in rows:
+            one.add_constraint(NotEqual(one.variables[x], one.variables[y]))
+
+        bulk = BTSolver()
+        bulk.add_variable_columns([f"x{i}" for i in range(4)], [[1, 2, 3]] * 4)
+        xs, ys = zip(*rows)
+        cs = bulk.add_constraint_columns(NotEqual, xs, ys)
+
+        self.assertListEqual([c.cid for c in cs], [0, 1, 2, 3])
+        for v1, v2 in zip(one.variables, bulk.variables):
+            self.assertSetEqual(v1.affected_constraints, v2.affected_constraints)
+            self.assertListEqual(v1.on_fix, v2.on_fix)
+        self.assertEqual(one.count(), bulk.count())
+        self.assertEqual(bulk.count(), 12)
+
+        with self.assertRaises(ValueError):
+            bulk.add_constraint_columns(NotEqual, [0, 1], [2])
+
+    def test_optimize(self):
+        print("Testing branch and bound")
+        solver = parse_question("AB + CD == EFG")
+        vs = {v.name: v for v in solver.variables}
+        cost = solver.add_objective([vs["A"], vs["B"]], [10, 1])
+
+        solver.find_all = True
+        solver.solve()
+        values = [s["objective"] for s in solver.solutions]
+        solver.solutions = []
+
+        improved = []
+        best = solver.optimize(cost, on_improve=lambda s, v, gap: improved.append(v))
+        self.assertEqual(best["objective"], min(values))
+        self.assertEqual(best["objective"], 10 * best["A"] + best["B"])
+        self.assertListEqual(improved, sorted(set(improved), reverse=True))
+        self.assertEqual(solver.status, STATUS_FINISHED)
+
+        best = solver.optimize(cost, minimize=False)
+        self.assertEqual(best["objective"], max(values))
+        self.assertEqual(solver.count(), len(values))  # restored, no bound left
+
+    def test_optimize_nogoods(self):
+        print("Testing branch and bound with backjumping")
+        solver = parse_question("AB + CD == EFG")
+        solver.backjumping = True
+        solver.nogoods = NogoodStore()
+        vs = {v.name: v for v in solver.variables}
+        cost = solver.add_objective([vs["A"], vs["B"]], [10, 1])
+
+        count = solver.count()
+        solver.optimize(cost)
+        # the nogoods found under the bound are dropped with it
+        self.assertEqual(solver.count(), count)
+
+    def test_optimize_interval(self):
+        print("Testing branch and bound over big intervals")
+        from constraint import LessThan
+
+        solver = BTSolver()
+        x, y, z = [Variable(n, range(10**6)) for n in "XYZ"]
+        solver.add_variables([x, y, z])
+        solver.add_constraint(LessThan(x, y, include_equal=True))  # x < y
+        cost = solver.add_objective([x, y, z], [1, 2, 3])
+
+        best = solver.optimize(cost)
+        self.assertEqual(best["objective"], 2)
+        self.assertLess(solver.stats.nodes, 10)
+
+        self.assertEqual(solver.count(limit=1, assumptions=[(0, 10**6)]), 0)
+        self.assertEqual(solver.count(limit=1, assumptions=[(0, 10)]), 1)
@@ -0,0 +1,35 @@
+import unittest
+from domain import Domain
+from domain_bitset import BitsetDomain
+from trail import Trail
+
+
+class TestTrail(unittest.TestCase):
+    def test_trail(self):
+        for domain_type in [Domain, BitsetDomain]:
+            trail = Trail()
+            a = domain_type(list(range(10)))
+            b = domain_type(list(range(10)))
+            a.trail = trail
+            b.trail = trail
+
+            trail.push()
+            a.remove([i for i, v in enumerate(a.values()) if v == 0])
+            # recorded only once under a choice point
+            a.remove([i for i, v in enumerate(a.values()) if v == 1])
+            self.assertEqual(len(trail.entries), 1)
+
+            trail.push()
+            a.assign(5)
+            self.assertEqual(len(trail.entries), 2)
+
+            trail.pop()  # only `a` is restored, `b` is untouched
+            self.assertListEqual(sorted(a.values()), list(range(2, 10)))
+            self.assertEqual((a.min(), a.max()), (2, 9))
+
+            trail.push()
+            b.remove([i for i, v in enumerate(b.values()) if v == 9])
+            trail.pop_to(0)
+            self.assertListEqual(sorted(a.values()), list(range(10)))
+            self.assertListEqual(sorted(b.values()), list(range(10)))
+            self.assertEqual(len(trail.entries), 0)
@@ -0,0 +1,62 @@
+# A solver-wide trail for restoring domains on backtracking.
+#
+# Instead of snapshotting every unassigned variable at each choice point,
+#  a domain saves its state to the trail only the first time it's modified
+#  below the current choice point. Backtracking restores just those domains.
+#
+#   push()                      # choice point 1
+#     A.remove(..)  -> record A
+#     A.remove(..)              # already recorded under this choice point
+#     push()                    # choice point 2
+#       A.remove(..) -> record A
+#       B.remove(..) -> record B
+#     pop()                     # restore B, A
+#   pop()                       # restore A
+#
+# A domain that works with the trail has:
+#  - `trail`: the Trail, or None when it's not used
+#  - `stamp`: the choice point it was last recorded under
+#  - `save_state()` / `restore_state(state)`
+# Other reversible state, e.g. the tuples of a `Table`, is recorded the same
+#  way, with a `vid` of -1.
+
+
+class Trail:
+    def __init__(self):
+        self.entries = []  # (domain, state, previous stamp)
+        self.limits = []  # len(entries) at each choice point
+        self.stamps = []  # the stamp of the parent choice point
+        self.stamp = 0  # unique id of the current choice point
+        self.counter = 0
+        self.on_restore = None  # called with each restored variable domain
+
+    def depth(self) -> int:
+        return len(self.limits)
+
+    def push(self):
+        self.limits.append(len(self.entries))
+        self.stamps.append(self.stamp)
+        self.counter += 1
+        self.stamp = self.counter
+
+    def record(self, domain):
+        self.entries.append((domain, domain.save_state(), domain.stamp))
+        domain.stamp = self.stamp
+
+    # Undo all changes since the last `push()`
+    def pop(self):
+        limit = self.limits.pop()
+        entries = self.entries
+        on_restore = self.on_restore
+        while len(entries) > limit:
+            domain, state, stamp = entries.pop()
+            domain.restore_state(state)
+            domain.stamp = stamp
+            if on_restore is not None and domain.vid >= 0:
+                on_restore(domain)
+        self.stamp = self.stamps.pop()
+
+    # Undo until there are only `depth` choice points left
+    def pop_to(self, depth: int):
+        while len(self.limits) > depth:
+            self.pop()
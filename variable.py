@@ -1,11 +1,40 @@
 from domain import Domain
+from domain_interval import IntervalDomain
 
 
 class Variable:
-    def __init__(self, name: str, values: list[int]):
+    __slots__ = (
+        "name",
+        "domain",
+        "vid",
+        "affected_constraints",
+        "on_fix",
+        "on_bound",
+        "on_domain",
+    )
+
+    # A `range` of at least this many values is an `IntervalDomain` by default
+    INTERVAL_SIZE = 64
+
+    # values: a list, or a `range`
+    # domain_type: `Domain`, `BitsetDomain` or `IntervalDomain`, or anything
+    #  with the same interface. None: `IntervalDomain` for a big `range`,
+    #  `Domain` for everything else.
+    def __init__(self, name: str, values: list[int], domain_type: type | None = None):
+        if domain_type is None:
+            big = isinstance(values, range) and len(values) >= Variable.INTERVAL_SIZE
+            domain_type = IntervalDomain if big else Domain
+        if isinstance(values, range) and domain_type is not IntervalDomain:
+            values = list(values)
+
         self.name = name
-        self.domain = Domain(values)
+        self.domain = domain_type(values)
         self.affected_constraints = set()
 
+        # constraints subscribed to each event, see "event.py"
+        self.on_fix = list[int]()
+        self.on_bound = list[int]()
+        self.on_domain = list[int]()
+
     def __repr__(self):
         return f"{self.name} = {self.domain.values()}"